@@ -0,0 +1,143 @@
+"""End-to-end benchmarks of the real cogs against a fake gateway and the SQLite storage backend.
+
+Scenarios:
+    rsvp     10k ✅ reactions on one event, dispatched concurrently like gateway events
+    invites  500 concurrent invite requests on the central embed
+    startup  load_rsvp_events + sync_reactions_on_startup with 1k tracked events
+
+Run from the repository root:
+
+    python -m benchmarks.bench_gateway [scenario ...] [--api-latency S] [--db-latency S]
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime
+
+from benchmarks.fakes import RSVP_EMOJI, FakeReaction, snowflake
+from benchmarks.harness import UTC, Report, build_bot, close_bot, quiesce, quiet_logs, seed_event
+from cogs.invite_system import InviteSystem
+from cogs.rsvp_system import RSVPCog
+
+
+async def rsvp_scenario(args):
+    """Many users reacting to one flyer at once: the Friday-night announcement spike."""
+    bot = await build_bot(args.api_latency, args.db_latency)
+    channel = bot.guild.add_channel()
+    flyer = channel.add_message()
+    await seed_event(bot.storage, flyer.id, channel.id)
+    members = [bot.guild.add_member() for _ in range(args.reactions)]
+
+    cog = RSVPCog(bot)
+    quiesce(cog)
+    await cog.load_rsvp_events()
+    await bot.add_cog(cog)
+    bot.storage.db.reset_counts()
+
+    report = Report(f"rsvp: {args.reactions} reactions on one event")
+    with report:
+        # discord.py runs every listener invocation as its own task
+        await asyncio.gather(*(
+            report.timed(cog.on_raw_reaction_add(bot.reaction(flyer.id, member.id))) for member in members
+        ))
+        await cog.rsvp_queue.flush()
+    report.queries = dict(bot.storage.db.queries)
+
+    stored = await bot.storage.db.fetchone("SELECT COUNT(*) FROM rsvp_users")
+    confirmed = sum(1 for member in members if member.dms)
+    report.notes.append(f"stored RSVPs {stored[0]}, confirmation DMs {confirmed}")
+    await close_bot(bot)
+    return report
+
+
+async def invites_scenario(args):
+    """Members reacting to the central embed to request invite QR codes."""
+    bot = await build_bot(args.api_latency, args.db_latency)
+    channel = bot.guild.add_channel()
+    central = channel.add_message()
+    await bot.embeds.save('central', central.id, channel.id)
+    members = [bot.guild.add_member() for _ in range(args.invites)]
+
+    cog = InviteSystem(bot)
+    await bot.add_cog(cog)
+    bot.storage.db.reset_counts()
+
+    report = Report(f"invites: {args.invites} concurrent requests")
+    with report:
+        await asyncio.gather(*(
+            report.timed(cog.on_raw_reaction_add(bot.reaction(central.id, member.id, emoji="📨")))
+            for member in members
+        ))
+    report.queries = dict(bot.storage.db.queries)
+
+    delivered = sum(1 for member in members if member.dms)
+    report.notes.append(f"QR codes delivered {delivered}")
+    await close_bot(bot)
+    return report
+
+
+async def startup_scenario(args):
+    """A restart with many upcoming events, some of which gained or lost reactions while offline."""
+    bot = await build_bot(args.api_latency, args.db_latency)
+    channels = [bot.guild.add_channel() for _ in range(10)]
+    members = [bot.guild.add_member() for _ in range(200)]
+    rng = random.Random(42)
+
+    changed = 0
+    for i in range(args.events):
+        channel = channels[i % len(channels)]
+        flyer = channel.add_message(snowflake())
+        event_id = await seed_event(bot.storage, flyer.id, channel.id, name=f"Event {i}")
+        rsvps = rng.sample(members, rng.randint(0, 40))
+        await bot.storage.rsvps.add_many([(event_id, member.id, datetime.now(UTC)) for member in rsvps])
+        # One event in ten changed while the bot was down
+        if i % 10 == 0:
+            changed += 1
+            rsvps = rsvps[1:] + rng.sample(members, 3)
+        flyer.reactions.append(FakeReaction(RSVP_EMOJI, list(dict.fromkeys(rsvps))))
+
+    cog = RSVPCog(bot)
+    quiesce(cog)
+    await bot.add_cog(cog)
+    bot.storage.db.reset_counts()
+
+    report = Report(f"startup: {args.events} events")
+    with report:
+        await report.timed(cog.load_rsvp_events())
+        await report.timed(cog.sync_reactions_on_startup())
+    report.queries = dict(bot.storage.db.queries)
+    report.notes.append(f"tracked events {len(cog.events)}, changed while offline {changed}")
+    report.notes.append("latencies: [load_rsvp_events, sync_reactions_on_startup]")
+    await close_bot(bot)
+    return report
+
+
+SCENARIOS = {
+    "rsvp": rsvp_scenario,
+    "invites": invites_scenario,
+    "startup": startup_scenario,
+}
+
+
+async def run(args):
+    for name in args.scenarios or SCENARIOS:
+        report = await SCENARIOS[name](args)
+        print(report.render())
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", choices=[[], *SCENARIOS], help="Scenarios to run (default: all)")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Simulated Discord REST latency in seconds")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="Extra simulated round trip per statement (e.g. 0.0005 for a LAN MySQL)")
+    parser.add_argument("--reactions", type=int, default=10_000)
+    parser.add_argument("--invites", type=int, default=500)
+    parser.add_argument("--events", type=int, default=1_000)
+    args = parser.parse_args()
+    quiet_logs()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Micro-benchmark: original invite QR rendering vs. the cached palette renderer.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_qr_render [iterations]
+"""
+import sys
+import time
+from io import BytesIO
+
+import qrcode
+from PIL import ImageDraw, ImageFont
+
+from utils.qr_render import QRRenderer
+
+SAMPLE_URL = "https://discord.gg/aB3dE6gH"
+
+
+def legacy_render(data):
+    """The pre-cache InviteSystem.create_qr_image, encoding to memory instead of disk."""
+    invite_code = data.split("https://")[-1]
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="#00FFE4", back_color="black").convert("RGBA")
+
+    draw = ImageDraw.Draw(img)
+    font_title = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 28)
+    font_code = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 22)
+
+    title_text = "DARKNET"
+    title_x = (img.width - draw.textlength(title_text, font=font_title)) // 2
+    draw.text((title_x, 10), title_text, font=font_title, fill="#00FFE4")
+
+    code_text = f"{invite_code}"
+    code_x = (img.width - draw.textlength(code_text, font=font_code)) // 2
+    draw.text((code_x, img.height - 40), code_text, font=font_code, fill="#00FFE4")
+
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer
+
+
+def measure(render, iterations):
+    render(SAMPLE_URL)  # Warm up caches and imports
+    start = time.perf_counter()
+    for i in range(iterations):
+        buffer = render(f"{SAMPLE_URL}{i % 10}")
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1000, len(buffer.getvalue())
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    renderer = QRRenderer()
+
+    legacy_ms, legacy_bytes = measure(legacy_render, iterations)
+    cached_ms, cached_bytes = measure(renderer.render, iterations)
+
+    print(f"QR invite rendering, {iterations} iterations")
+    print(f"  legacy RGBA path : {legacy_ms:7.2f} ms/invite  {legacy_bytes:6d} bytes")
+    print(f"  cached P-mode    : {cached_ms:7.2f} ms/invite  {cached_bytes:6d} bytes")
+    print(f"  speedup {legacy_ms / cached_ms:.1f}x, size {cached_bytes / legacy_bytes:.0%} of legacy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Reminder delivery load test: festival-scale fan-out against a simulated DM endpoint.
+
+Seeds N events with M RSVPs each, all due within `--spread` seconds, and
+lets the real RSVPCog.reminder_task fire them through the outbox. DMs go to a DMEndpoint that
+enforces a global rate limit, closes DMs for a fraction of users and adds
+latency, so no real user is ever messaged. Reports reminder lateness
+(due -> fan-out start) and time-to-last-delivery (due -> fan-out done)
+per event, plus the endpoint's response mix.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_reminders [--events N] [--rsvps M] [--spread S] ...
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from benchmarks.fakes import DMEndpoint
+from benchmarks.harness import UTC, Report, build_bot, close_bot, percentile, quiesce, quiet_logs, seed_event
+from cogs.rsvp_system import RSVPCog
+
+
+async def reminder_load(args):
+    bot = await build_bot(db_latency=args.db_latency)
+    endpoint = DMEndpoint(args.latency, args.global_limit, args.forbidden_rate, args.error_rate)
+    channel = bot.guild.add_channel()
+    members = [bot.guild.add_member(dm_endpoint=endpoint) for _ in range(args.rsvps * 2)]
+
+    lead = 2.0  # Seconds to load the events before the first reminder falls due
+    for i in range(args.events):
+        flyer = channel.add_message()
+        offset = lead + (args.spread * i / (args.events - 1) if args.events > 1 else 0)
+        event_id = await seed_event(bot.storage, flyer.id, channel.id, name=f"Festival stage {i}",
+                                    reminder_in=timedelta(seconds=offset))
+        rsvps = members[i % 2::2][:args.rsvps]  # Overlapping audiences, like a multi-stage festival
+        await bot.storage.rsvps.add_many([(event_id, member.id, datetime.now(UTC)) for member in rsvps])
+
+    cog = RSVPCog(bot)
+    quiesce(cog)
+    await cog.load_rsvp_events()
+    cog.reminder_task.start()  # The only loop under test
+    await bot.add_cog(cog)
+    bot.storage.db.reset_counts()
+
+    # Measure each event's fan-out from the outside, around the real send_event_reminders
+    lateness, last_delivery, due, finished, done = [], [], [], [], asyncio.Event()
+    send_event_reminders = cog.send_event_reminders
+
+    async def timed_send(event):
+        due.append(event.reminder_time)
+        lateness.append((datetime.now(UTC) - event.reminder_time).total_seconds())
+        await send_event_reminders(event)
+        progress = cog.fanout.progress[event.event_id]  # Filled in by the outbox worker as it delivers
+        while progress.finished_at is None:
+            await asyncio.sleep(0.01)
+        finished.append(datetime.now(UTC))
+        last_delivery.append((finished[-1] - event.reminder_time).total_seconds())
+        if len(last_delivery) == args.events:
+            done.set()
+
+    cog.send_event_reminders = timed_send
+
+    report = Report(f"reminders: {args.events} events x {args.rsvps} RSVPs")
+    with report:
+        await asyncio.wait_for(done.wait(), timeout=args.timeout)
+    report.elapsed = (max(finished) - min(due)).total_seconds()  # First reminder due -> last delivery
+    report.latencies = last_delivery
+    report.queries = dict(bot.storage.db.queries)
+
+    outcomes = endpoint.outcomes
+    sent = [progress.sent for progress in cog.fanout.progress.values()]
+    forbidden = [progress.forbidden for progress in cog.fanout.progress.values()]
+    failed = [progress.failed for progress in cog.fanout.progress.values()]
+    if endpoint.delivered:
+        window = endpoint.delivered[-1][0] - endpoint.delivered[0][0]
+        rate = len(endpoint.delivered) / window if window else float(len(endpoint.delivered))
+    else:
+        rate = 0.0
+    report.notes.append("latency above = time from reminder due to last delivery, per event")
+    report.notes.append(
+        f"lateness       p50 {percentile(lateness, 50) * 1000:.0f} ms, p99 {percentile(lateness, 99) * 1000:.0f} ms, "
+        f"max {max(lateness) * 1000:.0f} ms"
+    )
+    report.notes.append(f"deliveries     sent {sum(sent)}, DMs closed {sum(forbidden)}, failed {sum(failed)}")
+    report.notes.append(
+        f"endpoint       200: {outcomes['200']}, 403: {outcomes['403']}, 429: {outcomes['429']}, 503: {outcomes['503']}"
+    )
+    report.notes.append(f"delivery rate  {rate:.1f} DM/s (endpoint limit {args.global_limit}/s)")
+
+    await close_bot(bot)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5, help="Events whose reminders fall due")
+    parser.add_argument("--rsvps", type=int, default=200, help="RSVPs per event")
+    parser.add_argument("--spread", type=float, default=0.0, help="Seconds between the first and last reminder")
+    parser.add_argument("--latency", type=float, default=0.08, help="Mean DM request latency in seconds")
+    parser.add_argument("--global-limit", type=int, default=50, help="Endpoint requests per second before 429s")
+    parser.add_argument("--forbidden-rate", type=float, default=0.05, help="Fraction of users with DMs closed")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Fraction of requests failing with 503")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="Extra simulated round trip per statement (e.g. 0.0005 for a LAN MySQL)")
+    parser.add_argument("--timeout", type=float, default=900, help="Give up after this many seconds")
+    args = parser.parse_args()
+    quiet_logs()
+    report = asyncio.run(reminder_load(args))
+    print(report.render())
+
+
+if __name__ == "__main__":
+    main()
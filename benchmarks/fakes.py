@@ -0,0 +1,231 @@
+"""Offline stand-ins for the parts of discord.py the cogs touch.
+
+Only the attributes and coroutines the cogs actually use are implemented.
+Every REST-style coroutine sleeps for `api_latency` seconds so concurrency
+and fan-out behave like they would against the real API, without a token
+or a network connection.
+"""
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter, deque
+from types import SimpleNamespace
+
+import discord
+
+RSVP_EMOJI = "✅"
+
+_ids = itertools.count(10**17)
+
+
+def snowflake():
+    return next(_ids)
+
+
+class DMEndpoint:
+    """Simulated DM route with Discord-like failure modes.
+
+    Requests over `global_limit` per second get a global 429 with
+    Retry-After, a `forbidden_rate` fraction of users have DMs closed
+    (403 on every attempt) and `error_rate` of requests fail with a 503.
+    Latency is drawn uniformly from `latency` +/- 50%.
+    """
+
+    def __init__(self, latency=0.08, global_limit=50, forbidden_rate=0.05, error_rate=0.01, seed=0):
+        self.latency = latency
+        self.global_limit = global_limit
+        self.forbidden_rate = forbidden_rate
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.window = deque()  # Request times in the current one-second window
+        self.closed = {}  # user id -> DMs closed
+        self.outcomes = Counter()
+        self.delivered = []  # (monotonic time, user id, content)
+
+    def _response(self, status, reason, headers=None):
+        return SimpleNamespace(status=status, reason=reason, headers=headers or {})
+
+    async def deliver(self, user, content):
+        now = time.monotonic()
+        while self.window and now - self.window[0] >= 1.0:
+            self.window.popleft()
+        if len(self.window) >= self.global_limit:
+            self.outcomes["429"] += 1
+            retry_after = f"{1.0 - (now - self.window[0]):.3f}"
+            response = self._response(429, "Too Many Requests", {"Retry-After": retry_after, "X-RateLimit-Global": "true"})
+            raise discord.HTTPException(response, "You are being rate limited.")
+        self.window.append(now)
+
+        await asyncio.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+        if self.closed.setdefault(user.id, self.rng.random() < self.forbidden_rate):
+            self.outcomes["403"] += 1
+            raise discord.Forbidden(self._response(403, "Forbidden"), "Cannot send messages to this user")
+        if self.rng.random() < self.error_rate:
+            self.outcomes["503"] += 1
+            raise discord.HTTPException(self._response(503, "Service Unavailable"), "upstream connect error")
+        self.outcomes["200"] += 1
+        self.delivered.append((time.monotonic(), user.id, content))
+
+
+class FakeUser:
+    def __init__(self, user_id=None, name=None, bot=False, api_latency=0.0, dm_endpoint=None):
+        self.id = user_id or snowflake()
+        self.name = name or f"user{self.id}"
+        self.bot = bot
+        self.api_latency = api_latency
+        self.dm_endpoint = dm_endpoint  # DMEndpoint to route DMs through, if any
+        self.dms = []  # Every message "delivered" to this user
+
+    def __str__(self):
+        return self.name
+
+    async def send(self, content=None, file=None, **kwargs):
+        if self.dm_endpoint:
+            await self.dm_endpoint.deliver(self, content)
+        else:
+            await asyncio.sleep(self.api_latency)
+        self.dms.append(content)
+
+
+class FakeMember(FakeUser):
+    def __init__(self, *args, administrator=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.guild_permissions = SimpleNamespace(administrator=administrator)
+
+
+class FakeReaction:
+    def __init__(self, emoji, users, me=True):
+        self.emoji = emoji
+        self._users = users
+        self.me = me
+        self.count = len(users) + (1 if me else 0)
+
+    async def users(self):
+        for user in self._users:
+            yield user
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id=None, reactions=()):
+        self.channel = channel
+        self.id = message_id or snowflake()
+        self.reactions = list(reactions)
+        self.created_at = discord.utils.snowflake_time(self.id)
+
+
+class FakeInvite:
+    def __init__(self):
+        self.code = f"{snowflake():x}"[-8:]
+        self.url = f"https://discord.gg/{self.code}"
+
+
+class FakeChannel:
+    def __init__(self, guild, channel_id=None, api_latency=0.0):
+        self.guild = guild
+        self.id = channel_id or snowflake()
+        self.api_latency = api_latency
+        self.messages = {}
+        self.mention = f"<#{self.id}>"
+
+    def add_message(self, message_id=None, reactions=()):
+        message = FakeMessage(self, message_id, reactions)
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id):
+        await asyncio.sleep(self.api_latency)
+        try:
+            return self.messages[message_id]
+        except KeyError:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Message")
+
+    def get_partial_message(self, message_id):
+        return SimpleNamespace(id=message_id, delete=lambda: self._delete(message_id))
+
+    async def _delete(self, message_id):
+        await asyncio.sleep(self.api_latency)
+        self.messages.pop(message_id, None)
+
+    async def delete_messages(self, messages):
+        await asyncio.sleep(self.api_latency)
+        for message in messages:
+            self.messages.pop(message.id, None)
+
+    async def create_invite(self, **kwargs):
+        await asyncio.sleep(self.api_latency)
+        return FakeInvite()
+
+    async def send(self, content=None, **kwargs):
+        await asyncio.sleep(self.api_latency)
+        return self.add_message()
+
+
+class FakeGuild:
+    def __init__(self, guild_id=None, api_latency=0.0):
+        self.id = guild_id or snowflake()
+        self.api_latency = api_latency
+        self.members = {}
+        self.channels = {}
+        self.text_channels = []
+
+    @property
+    def member_count(self):
+        return len(self.members)
+
+    def add_member(self, **kwargs):
+        member = FakeMember(api_latency=self.api_latency, **kwargs)
+        self.members[member.id] = member
+        return member
+
+    def add_channel(self, channel_id=None):
+        channel = FakeChannel(self, channel_id, self.api_latency)
+        self.channels[channel.id] = channel
+        self.text_channels.append(channel)
+        return channel
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+
+class FakeBot:
+    """Just enough of commands.Bot to load the real cogs and dispatch gateway events to them."""
+
+    def __init__(self, storage, api_latency=0.0):
+        self.storage = storage
+        self.user = FakeUser(name="Galaxian", bot=True)
+        self.guild = FakeGuild(api_latency=api_latency)
+        self.guilds = [self.guild]
+        self.cogs = {}
+        self.ready = asyncio.Event()  # Never set: loops gated on wait_until_ready stay idle
+
+    def get_guild(self, guild_id):
+        return self.guild if guild_id == self.guild.id else None
+
+    def get_channel(self, channel_id):
+        return self.guild.channels.get(channel_id)
+
+    def get_user(self, user_id):
+        return self.guild.get_member(user_id)
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    async def add_cog(self, cog):
+        await discord.utils.maybe_coroutine(cog.cog_load)
+        self.cogs[cog.qualified_name] = cog
+
+    async def remove_cogs(self):
+        for cog in self.cogs.values():
+            await discord.utils.maybe_coroutine(cog.cog_unload)
+        self.cogs.clear()
+
+    async def wait_until_ready(self):
+        await self.ready.wait()
+
+    async def change_presence(self, **kwargs):
+        pass
+
+    def reaction(self, message_id, user_id, emoji=RSVP_EMOJI):
+        """A raw reaction payload as the gateway would deliver it."""
+        return SimpleNamespace(message_id=message_id, user_id=user_id, guild_id=self.guild.id, emoji=emoji)
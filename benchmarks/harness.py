@@ -0,0 +1,136 @@
+"""Shared plumbing for the offline benchmarks: bot setup, latency sampling and reports."""
+import asyncio
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytz
+from discord.ext import tasks
+
+from benchmarks.fakes import FakeBot
+from storage.sqlite import SQLiteDatabase, SQLiteStorage
+from utils.embed_registry import EmbedRegistry
+from utils.metrics import query_labels
+
+UTC = pytz.utc
+
+
+class CountingSQLiteDatabase(SQLiteDatabase):
+    """SQLite driver that counts statements by (operation, table) and can add a simulated network round trip."""
+
+    def __init__(self, path, latency=0.0):
+        super().__init__(path)
+        self.latency = latency
+        self.queries = Counter()
+
+    def reset_counts(self):
+        self.queries.clear()
+
+    async def _run(self, query, *args, **kwargs):
+        self.queries[query_labels(query)] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await super()._run(query, *args, **kwargs)
+
+
+async def build_bot(api_latency=0.0, db_latency=0.0):
+    """A FakeBot wired to a fresh SQLite (WAL) database in a temp directory, like main() wires the real one."""
+    workdir = tempfile.mkdtemp(prefix="galaxian-bench-")
+    storage = SQLiteStorage(db=CountingSQLiteDatabase(os.path.join(workdir, "bench.db"), db_latency))
+    await storage.connect()
+    await storage.migrate()
+    bot = FakeBot(storage, api_latency=api_latency)
+    bot.workdir = workdir
+    bot.embeds = EmbedRegistry(storage.embeds)
+    await bot.embeds.load()
+    return bot
+
+
+async def close_bot(bot):
+    await bot.remove_cogs()
+    await bot.storage.close()
+    shutil.rmtree(bot.workdir, ignore_errors=True)
+
+
+def quiesce(cog):
+    """Stop a cog's background tasks.loop iterations so they don't skew a scenario."""
+    for name in dir(type(cog)):
+        loop = getattr(cog, name, None)
+        if isinstance(loop, tasks.Loop) and loop.is_running():
+            loop.cancel()
+
+
+async def seed_event(storage, message_id, channel_id, name="Benchmark Party", reminder_in=timedelta(days=1)):
+    """Insert an event row shaped like EventCog.new_event writes them and return its id."""
+    now = datetime.now(UTC)
+    start = now + reminder_in + timedelta(hours=3)
+    return await storage.events.create(
+        name=name, crew_name="Bench Crew", flyer_url="https://example.com/flyer.png",
+        crew_logo_url="https://example.com/logo.png", location="Warehouse 9", event_date=start.date(),
+        start_time=start, end_time=start + timedelta(hours=6), age_requirement="21+", cover_fee="$20",
+        contact_info="@benchcrew", event_type="Rave", reminder_time=now + reminder_in,
+        message_id=message_id, channel_id=channel_id,
+    )
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+class Report:
+    """Collects per-operation latencies and renders throughput, p50/p99 and DB query counts."""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.started = None
+        self.elapsed = 0.0
+        self.queries = {}
+        self.notes = []
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
+
+    async def timed(self, coro):
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    def percentile(self, pct):
+        return percentile(self.latencies, pct)
+
+    def render(self):
+        ops = len(self.latencies)
+        lines = [f"== {self.name} =="]
+        lines.append(f"  operations     {ops}")
+        lines.append(f"  wall time      {self.elapsed * 1000:.1f} ms")
+        if ops:
+            lines.append(f"  throughput     {ops / self.elapsed:,.1f} ops/s")
+            lines.append(f"  latency p50    {self.percentile(50) * 1000:.2f} ms")
+            lines.append(f"  latency p99    {self.percentile(99) * 1000:.2f} ms")
+        total = sum(self.queries.values())
+        lines.append(f"  DB statements  {total}")
+        for (operation, table), count in sorted(self.queries.items(), key=lambda item: -item[1]):
+            lines.append(f"    {operation:<8} {table:<14} {count}")
+        lines.extend(f"  {note}" for note in self.notes)
+        return "\n".join(lines)
+
+
+def quiet_logs(level=logging.WARNING):
+    """The cogs log at INFO per event; keep benchmark output readable."""
+    logging.basicConfig(level=level, format="%(levelname)s %(name)s: %(message)s")
@@ -1,16 +1,48 @@
+import logging
+import asyncio
 import discord
 from discord.ext import commands, tasks
 from datetime import datetime, timedelta, timezone
+from utils.invite_stats import InviteStats
+from utils.metrics import instrument_loop
 
+log = logging.getLogger(__name__)
 
 class EmbedManagement(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.cursor = bot.cursor
-        self.conn = bot.conn
+        self.storage = bot.storage
         self.PST = timezone(timedelta(hours=-8))
-        print("EmbedManagement cog initialized.")
-        self.update_invite_board.start()  # Start the task when the cog is loaded
+        self.stats = InviteStats()  # Invite board numbers, updated by member and invite events
+        self.stats.listeners.append(self.request_board_update)
+        self.invite_board_channel_id = 1308580887197257809  # Replace with your invite board channel ID
+        self.board_message = None  # Cached handle to the published board message
+        self.board_hash = None  # Hash of the stats last published to the board
+        self.board_update_task = None  # Pending debounced board update
+        self.board_debounce = 30  # Seconds to coalesce joins/invites before editing the board
+        self.leader = getattr(bot, "leader", None)  # Only the lease holder publishes the board
+        log.info("EmbedManagement cog initialized.")
+        if self.leader is None or self.leader.is_leader:
+            self.update_invite_board.start()  # Start the task when the cog is loaded
+        if self.leader is not None:
+            self.leader.listeners.append(self.on_leadership)
+
+    def cog_unload(self):
+        if self.leader is not None and self.on_leadership in self.leader.listeners:
+            self.leader.listeners.remove(self.on_leadership)
+        self.update_invite_board.cancel()
+        if self.board_update_task:
+            self.board_update_task.cancel()
+
+    def on_leadership(self, is_leader):
+        """Lease listener: publish the invite board only while this instance leads."""
+        if is_leader:
+            if not self.update_invite_board.is_running():
+                self.update_invite_board.start()
+        else:
+            self.update_invite_board.cancel()
+            if self.board_update_task:
+                self.board_update_task.cancel()
 
     @commands.command(name="embedhere")
     @commands.has_permissions(administrator=True)
@@ -21,7 +53,7 @@ class EmbedManagement(commands.Cog):
         channel = self.bot.get_channel(950561797381955634)
         if channel is None:
             await ctx.send("The specified channel could not be found.")
-            print("embed_here: Channel not found.")
+            log.warning("embed_here: Channel not found.")
             return
 
         await ctx.send("Creating or updating the embed...")
@@ -32,12 +64,7 @@ class EmbedManagement(commands.Cog):
         Logic for creating or updating the embed with specific content.
         """
         # Check if an embed already exists
-        try:
-            self.cursor.execute("SELECT message_id, channel_id FROM embeds WHERE id = 'central'")
-            row = self.cursor.fetchone()
-        except Exception as e:
-            print(f"create_new_embed: Failed to fetch embed info from database. Error: {e}")
-            row = None
+        row = self.bot.embeds.get('central')
 
         old_message = None
         if row:
@@ -46,9 +73,9 @@ class EmbedManagement(commands.Cog):
                 try:
                     old_message = await old_channel.fetch_message(row[0])
                 except discord.NotFound:
-                    print("create_new_embed: Old message not found.")
+                    log.warning("create_new_embed: Old message not found.")
                 except Exception as e:
-                    print(f"create_new_embed: Failed to fetch old message. Error: {e}")
+                    log.error(f"create_new_embed: Failed to fetch old message. Error: {e}")
 
                 # Create embed content
         embed = discord.Embed(
@@ -92,20 +119,24 @@ class EmbedManagement(commands.Cog):
         if old_message:
             await old_message.edit(embed=embed)
             message = old_message
-            print("create_new_embed: Updated existing embed.")
+            log.info("create_new_embed: Updated existing embed.")
         else:
             message = await channel.send(embed=embed)
-            print("create_new_embed: Sent new embed.")
+            log.info("create_new_embed: Sent new embed.")
 
         # Save embed info in the database
         try:
-            self.cursor.execute('''
-                INSERT INTO embeds (id, message_id, channel_id) VALUES (%s, %s, %s)
-                ON DUPLICATE KEY UPDATE message_id = VALUES(message_id), channel_id = VALUES(channel_id)
-            ''', ('central', message.id, channel.id))
-            self.conn.commit()
+            await self.bot.embeds.save('central', message.id, channel.id)
         except Exception as e:
-            print(f"create_new_embed: Failed to save embed info to database. Error: {e}")
+            log.error(f"create_new_embed: Failed to save embed info to database. Error: {e}")
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.stats.member_joined(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        self.stats.member_left(member)
 
     @commands.command(name="inviteboard")
     @commands.has_permissions(administrator=True)
@@ -113,57 +144,58 @@ class EmbedManagement(commands.Cog):
         """
         Create or update the invite summary board in a specific channel.
         """
-        channel = self.bot.get_channel(1308580887197257809)
+        channel = self.bot.get_channel(self.invite_board_channel_id)
         if channel is None:
             await ctx.send("The specified channel could not be found.")
-            print("invite_board: Channel not found.")
+            log.warning("invite_board: Channel not found.")
             return
 
         await ctx.send("Creating or updating the invite summary board...")
-        await self.create_invite_board_embed(channel)
+        await self.create_invite_board_embed(channel, force=True)
 
-    async def create_invite_board_embed(self, channel):
+    def request_board_update(self):
         """
-        Logic for creating or updating the invite summary board.
+        Push a board update soon after a meaningful change (join, leave, invite created).
+        Bursts of changes inside the debounce window collapse into a single edit.
         """
-        # Check if the invite board already exists
-        try:
-            self.cursor.execute("SELECT message_id, channel_id FROM embeds WHERE id = 'invite_board'")
-            row = self.cursor.fetchone()
-        except Exception as e:
-            print(f"create_invite_board_embed: Failed to fetch invite board info from database. Error: {e}")
-            row = None
+        if self.board_update_task and not self.board_update_task.done():
+            return
+        if self.leader is not None and not self.leader.is_leader:
+            return  # Stats stay current on followers; the leader publishes them
+        self.board_update_task = asyncio.create_task(self._debounced_board_update())
 
-        old_message = None
-        if row:
-            old_channel = self.bot.get_channel(row[1])
-            if old_channel:
-                try:
-                    old_message = await old_channel.fetch_message(row[0])
-                except discord.NotFound:
-                    print("create_invite_board_embed: Old invite board message not found.")
-                except Exception as e:
-                    print(f"create_invite_board_embed: Failed to fetch old invite board message. Error: {e}")
+    async def _debounced_board_update(self):
+        await asyncio.sleep(self.board_debounce)
+        channel = self.bot.get_channel(self.invite_board_channel_id)
+        if channel:
+            try:
+                await self.create_invite_board_embed(channel)
+            except Exception as e:
+                log.error(f"request_board_update: Failed to update invite board. Error: {e}")
 
-        # Calculate invite stats
-        try:
-            self.cursor.execute("SELECT COUNT(*) FROM invites")
-            active_invites = self.cursor.fetchone()[0] if self.cursor.fetchone() else 0
-        except Exception as e:
-            print(f"create_invite_board_embed: Failed to fetch active invites. Error: {e}")
-            active_invites = 0
+    async def create_invite_board_embed(self, channel, force=False):
+        """
+        Logic for creating or updating the invite summary board.
+        Skips the Discord round trip entirely when the stats have not changed since the last publish.
+        """
+        # Read invite stats from the incrementally maintained model
+        if not self.stats.loaded:
+            try:
+                await self.stats.load(self.bot, self.storage.invites)
+            except Exception as e:
+                log.error(f"create_invite_board_embed: Failed to load invite stats. Error: {e}")
 
-        recent_joins = sum(1 for member in self.bot.get_all_members() if member.joined_at and member.joined_at >= datetime.now(self.PST) - timedelta(hours=24))
-        try:
-            self.cursor.execute("SELECT inviter FROM invites ORDER BY last_invite DESC LIMIT 1")
-            last_invite_created_by = self.cursor.fetchone()
-            last_invite_created_by = last_invite_created_by[0] if last_invite_created_by else '----'
-        except Exception as e:
-            print(f"create_invite_board_embed: Failed to fetch last invite created by. Error: {e}")
-            last_invite_created_by = '----'
+        stats = self.stats.snapshot()
+        stats_hash = hash(tuple(sorted(stats.items())))
+        if not force and stats_hash == self.board_hash:
+            log.debug("create_invite_board_embed: Stats unchanged, skipping update.")
+            return
 
-        invite_conversion_rate = round((recent_joins / active_invites) * 100, 2) if active_invites else 0
-        member_count = sum(1 for _ in self.bot.get_all_members())
+        member_count = stats["member_count"]
+        active_invites = stats["active_invites"]
+        recent_joins = stats["recent_joins"]
+        last_invite_created_by = stats["last_inviter"]
+        invite_conversion_rate = stats["conversion_rate"]
 
         # Create the embed
         current_time = datetime.now(self.PST).strftime("%I:%M %p PST")
@@ -180,35 +212,54 @@ class EmbedManagement(commands.Cog):
             color=discord.Color.from_str('#00FFE4')
         )
 
+        # Reuse a handle to the existing board instead of fetching it first
+        if self.board_message is None:
+            row = self.bot.embeds.get('invite_board')
+            old_channel = self.bot.get_channel(row[1]) if row else None
+            if old_channel:
+                self.board_message = old_channel.get_partial_message(row[0])
+
         # Update or send new embed
-        if old_message:
-            await old_message.edit(embed=embed)
-            print("create_invite_board_embed: Updated existing invite board.")
-        else:
+        if self.board_message:
+            try:
+                await self.board_message.edit(embed=embed)
+                self.board_hash = stats_hash
+                log.info("create_invite_board_embed: Updated existing invite board.")
+                return
+            except discord.NotFound:
+                log.warning("create_invite_board_embed: Old invite board message not found.")
+                self.board_message = None
+            except discord.HTTPException as e:
+                # e.g. a 5xx or lost permissions; board_hash is unchanged so the next tick retries
+                log.error(f"create_invite_board_embed: Failed to edit invite board. Error: {e}")
+                return
+
+        try:
             message = await channel.send(embed=embed)
-            print("create_invite_board_embed: Sent new invite board.")
+        except discord.HTTPException as e:
+            log.error(f"create_invite_board_embed: Failed to send invite board. Error: {e}")
+            return
+        self.board_message = message
+        self.board_hash = stats_hash
+        log.info("create_invite_board_embed: Sent new invite board.")
 
-            # Save invite board info in the database
-            try:
-                self.cursor.execute('''
-                    INSERT INTO embeds (id, message_id, channel_id) VALUES (%s, %s, %s)
-                    ON DUPLICATE KEY UPDATE message_id = VALUES(message_id), channel_id = VALUES(channel_id)
-                ''', ('invite_board', message.id, channel.id))
-                self.conn.commit()
-            except Exception as e:
-                print(f"create_invite_board_embed: Failed to save invite board info to database. Error: {e}")
+        # Save invite board info in the database
+        try:
+            await self.bot.embeds.save('invite_board', message.id, channel.id)
+        except Exception as e:
+            log.error(f"create_invite_board_embed: Failed to save invite board info to database. Error: {e}")
 
     @tasks.loop(minutes=5)
+    @instrument_loop("update_invite_board")
     async def update_invite_board(self):
         """
-        Periodically update the invite summary board every 5 minutes.
+        Periodically refresh the invite summary board every 5 minutes (a no-op when nothing changed).
         """
-        channel = self.bot.get_channel(1308580887197257809)
+        channel = self.bot.get_channel(self.invite_board_channel_id)
         if channel:
-            print("update_invite_board: Updating invite board.")
             await self.create_invite_board_embed(channel)
         else:
-            print("update_invite_board: Channel not found, skipping update.")
+            log.warning("update_invite_board: Channel not found, skipping update.")
 
     @update_invite_board.before_loop
     async def before_update_invite_board(self):
@@ -222,6 +273,8 @@ async def setup(bot):
     """
     Set up the EmbedManagement cog.
     """
-    print("Setting up EmbedManagement cog...")
-    await bot.add_cog(EmbedManagement(bot))
-    print("EmbedManagement cog loaded successfully.")
+    log.info("Setting up EmbedManagement cog...")
+    cog = EmbedManagement(bot)
+    await bot.add_cog(cog)
+    bot.invite_stats = cog.stats  # Expose invite stats so InviteSystem can record invite writes
+    log.info("EmbedManagement cog loaded successfully.")
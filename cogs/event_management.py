@@ -1,103 +1,15 @@
+import logging
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from datetime import datetime, timedelta
 import pytz
+from utils.models import Event
+
+log = logging.getLogger(__name__)
 
 PST = pytz.timezone('America/Los_Angeles')
 UTC = pytz.utc
 
-class RSVPCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.reminders = []  # List of reminders: [(reminder_time, channel_id, message_id, event_data)]
-        self.event_messages = {}  # Track event embeds (message_id -> channel_id)
-        self.reminder_task.start()
-        self.cleanup_task.start()
-        self.event_monitor_task.start()
-
-    def cog_unload(self):
-        self.reminder_task.cancel()
-        self.cleanup_task.cancel()
-        self.event_monitor_task.cancel()
-
-    async def load_rsvp_events(self):
-        """Load existing events and reminders into memory at startup."""
-        cursor = self.bot.conn.cursor()
-        cursor.execute("""
-            SELECT message_id, channel_id, reminder_time, name, crew_name, flyer_url, crew_logo_url, location, event_date, start_time, end_time, age_requirement, cover_fee, contact_info, event_type
-            FROM events
-            WHERE reminder_sent = 0
-        """)
-        events = cursor.fetchall()
-
-        for event in events:
-            message_id, channel_id, reminder_time, name, crew_name, flyer_url, crew_logo_url, location, event_date, start_time, end_time, age_requirement, cover_fee, contact_info, event_type = event
-
-            # Convert times to PST for display
-            start_time = datetime.fromisoformat(start_time).astimezone(PST)
-            end_time = datetime.fromisoformat(end_time).astimezone(PST)
-
-            # Prepare event data
-            event_data = {
-                "name": name,
-                "crew_name": crew_name,
-                "flyer": flyer_url,
-                "crew_logo": crew_logo_url,
-                "location": location,
-                "date": event_date,
-                "start_time": start_time,
-                "end_time": end_time,
-                "age_requirement": age_requirement,
-                "cover_fee": cover_fee,
-                "info": contact_info,
-                "type": event_type,
-            }
-
-            # Add to reminders and message tracking
-            self.reminders.append((datetime.fromisoformat(reminder_time).astimezone(UTC), channel_id, message_id, event_data))
-            self.event_messages[message_id] = channel_id
-
-        print(f"Loaded {len(self.reminders)} reminders and {len(self.event_messages)} events into RSVP system.")
-
-    async def check_for_new_events(self):
-        """Fetch new events from the database and update memory."""
-        cursor = self.bot.conn.cursor()
-        existing_ids = tuple(self.event_messages.keys()) or (0,)
-        cursor.execute("""
-            SELECT message_id, channel_id, reminder_time, name, crew_name, flyer_url, crew_logo_url, location, event_date, start_time, age_requirement, cover_fee, contact_info, event_type
-            FROM events
-            WHERE message_id NOT IN %s
-        """, (existing_ids,))
-        new_events = cursor.fetchall()
-
-        for event in new_events:
-            message_id, channel_id, reminder_time, name, crew_name, flyer_url, crew_logo_url, location, event_date, start_time, age_requirement, cover_fee, contact_info, event_type = event
-
-            self.event_messages[message_id] = channel_id  # Track the event message
-
-            # Prepare the event data and add to reminders
-            event_data = {
-                "name": name,
-                "crew_name": crew_name,
-                "flyer": flyer_url,
-                "crew_logo": crew_logo_url,
-                "location": location,
-                "date": event_date,
-                "start_time": start_time,
-                "age_requirement": age_requirement,
-                "cover_fee": cover_fee,
-                "info": contact_info,
-                "type": event_type,
-            }
-            self.reminders.append((reminder_time, channel_id, message_id, event_data))
-
-            print(f"Added new event to RSVP system: message_id={message_id}, channel_id={channel_id}")
-
-async def setup(bot):
-    cog = RSVPCog(bot)
-    await cog.load_rsvp_events()
-    await bot.add_cog(cog)
-
 class EventCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -106,6 +18,30 @@ class EventCog(commands.Cog):
         """Parse 12-hour time input into a time object."""
         return datetime.strptime(input_time.strip().lower(), "%I:%M%p" if ":" in input_time else "%I%p").time()
 
+    def build_event_embed(self, event, acts):
+        """Build the public flyer embed for an event."""
+        embed = discord.Embed(
+            title=f"{event.name} hosted by {event.crew_name}",
+            description="Performing Acts:\n" + "\n".join(acts),
+            color=discord.Color.green()
+        )
+        embed.set_image(url=event.flyer)
+        if event.crew_logo:
+            embed.set_thumbnail(url=event.crew_logo)
+        embed.add_field(name="Location", value=event.location, inline=True)
+        embed.add_field(name="Type", value=event.type, inline=True)
+        embed.add_field(name="Date", value=event.date.strftime("%m-%d-%Y"), inline=True)
+        embed.add_field(name="Time", value=f"{event.start_time_pst} - {event.end_time_pst} PST", inline=True)
+        embed.add_field(name="Age Requirement", value=event.age_requirement, inline=True)
+        embed.add_field(name="Cover Fee", value=event.cover_fee, inline=True)
+        embed.add_field(
+            name="RSVP",
+            value="React with ✅ to RSVP and receive reminders and updates closer to the event.",
+            inline=False
+        )
+        embed.set_footer(text="Hosted by Your Discord Server")
+        return embed
+
     @commands.command(name="newevent")
     @commands.has_role("promoter")
     async def new_event(self, ctx):
@@ -206,7 +142,7 @@ class EventCog(commands.Cog):
                             event_data["multi_day"] = True
                             end_date = event_data["date"] + timedelta(days=num_days - 1)
                             event_data["end_date"] = end_date
-                            event_data["end_time"] = datetime.combine(end_date, datetime.min.time()).astimezone(UTC)
+                            event_data["end_time"] = PST.localize(datetime.combine(end_date, datetime.min.time())).astimezone(UTC)
                             break
                     except ValueError:
                         await event_channel.send("Please enter a valid number of days.")
@@ -268,28 +204,14 @@ class EventCog(commands.Cog):
                     await event_channel.send("Invalid format. Please provide a valid time (e.g., '2 hours', '30 minutes').")
                     msg = await ask_question("When should we send a reminder? (e.g., 2 hours, 30 minutes):")
 
-            embed = discord.Embed(
-                title=f"{event_data['name']} hosted by {event_data['crew_name']}",
-                description="Performing Acts:\n" + "\n".join(event_data["acts"]),
-                color=discord.Color.green()
-            )
-            embed.set_image(url=event_data["flyer"])
-            if event_data["crew_logo"]:
-                embed.set_thumbnail(url=event_data["crew_logo"])
-            embed.add_field(name="Location", value=event_data["location"], inline=True)
-            embed.add_field(name="Type", value=event_data["type"], inline=True)
-            embed.add_field(name="Date", value=event_data["date"].strftime("%m-%d-%Y"), inline=True)
-            start_time_pst = event_data["start_time"].astimezone(PST)
-            end_time_pst = event_data["end_time"].astimezone(PST)
-            embed.add_field(name="Time", value=f"{start_time_pst.strftime('%I:%M %p')} - {end_time_pst.strftime('%I:%M %p')} PST", inline=True)
-            embed.add_field(name="Age Requirement", value=event_data["age_requirement"], inline=True)
-            embed.add_field(name="Cover Fee", value=event_data["cover_fee"], inline=True)
-            embed.add_field(
-                name="RSVP",
-                value="React with ✅ to RSVP and receive reminders and updates closer to the event.",
-                inline=False
+            event = Event(
+                name=event_data["name"], crew_name=event_data["crew_name"], flyer=event_data["flyer"],
+                crew_logo=event_data["crew_logo"], location=event_data["location"], date=event_data["date"],
+                start_time=event_data["start_time"], end_time=event_data["end_time"],
+                reminder_time=event_data["reminder_time"], age_requirement=event_data["age_requirement"],
+                cover_fee=event_data["cover_fee"], info=event_data["info"], type=event_data["type"],
             )
-            embed.set_footer(text="Hosted by Your Discord Server")
+            embed = self.build_event_embed(event, event_data["acts"])
 
             await event_channel.send("Here is a preview of your event post:")
             preview_message = await event_channel.send(embed=embed)
@@ -311,38 +233,19 @@ class EventCog(commands.Cog):
             final_message = await post_channel.send(embed=embed)
             await final_message.add_reaction("\u2705")
 
-            cursor = self.bot.conn.cursor()
+            event.message_id = final_message.id
+            event.channel_id = post_channel.id
+            event.guild_id = post_channel.guild.id
             try:
-                cursor.execute('''
-                    INSERT INTO events (name, crew_name, flyer_url, crew_logo_url, location, event_date, start_time, end_time, age_requirement, cover_fee, contact_info, event_type, reminder_time, message_id, channel_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ''', (
-                    event_data["name"], event_data["crew_name"], event_data["flyer"], event_data["crew_logo"], event_data["location"],
-                    event_data["date"], event_data["start_time"], event_data["end_time"], event_data["age_requirement"],
-                    event_data["cover_fee"], event_data["info"], event_data["type"], event_data["reminder_time"], final_message.id, post_channel.id
-                ))
-                self.bot.conn.commit()
+                event.event_id = await self.bot.storage.events.create(**event.columns())
             except Exception as e:
-                print(f"Failed to save event to database: {e}")
-
-            cursor = self.bot.conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT event_id FROM events
-                WHERE message_id = %s
-            """, (final_message.id,))
-            result = cursor.fetchone()
-            if not result:
+                log.error(f"Failed to save event to database: {e}")
+
+            if not event.event_id:
                 raise ValueError(f"Failed to fetch event_id for message_id: {final_message.id}")
-            event_id = result["event_id"]
-            event_data["event_id"] = event_id
 
             await event_channel.delete()
-            await self.bot.rsvp_cog.register_event(
-                message_id=final_message.id,
-                channel_id=post_channel.id,
-                reminder_time=event_data["reminder_time"],
-                event_data=event_data,
-            )
+            await self.bot.rsvp_cog.register_event(event)
 
             try:
                 await ctx.author.send("Your event has been posted! Here is the final version:")
@@ -351,7 +254,7 @@ class EventCog(commands.Cog):
                 await ctx.send(f"{ctx.author.mention}, I couldn't send you a DM. Please make sure your DMs are open.")
 
         except Exception as e:
-            print(f"An error occurred during event setup: {e}")
+            log.exception(f"An error occurred during event setup: {e}")
             if event_channel:
                 await event_channel.delete()
 
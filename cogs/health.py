@@ -0,0 +1,71 @@
+import logging
+import time
+
+import discord
+from discord.ext import commands, tasks
+
+from utils.metrics import instrument_loop
+
+log = logging.getLogger(__name__)
+
+
+class HealthMonitor(commands.Cog):
+    """Single owner of DB/scheduler health checks and the bot's status presence."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.db_check_interval = 60  # Seconds without a successful query before the pool is pinged
+        self.db_ok = None
+        self.reminders_ok = None
+        self.presence = None  # Last presence sent to Discord
+        self.check_health.start()
+
+    def cog_unload(self):
+        self.check_health.cancel()
+
+    async def check_database(self):
+        """Treat recent successful queries as proof of health; only ping an idle pool."""
+        if time.monotonic() - self.bot.storage.last_success < self.db_check_interval:
+            return True
+        # Backend pings are non-blocking and bounded by a timeout, so a dead server never stalls the loop
+        return await self.bot.storage.ping()
+
+    def check_reminders(self):
+        rsvp_cog = self.bot.get_cog('RSVPCog')
+        if rsvp_cog and rsvp_cog.leader is not None and not rsvp_cog.leader.is_leader:
+            return True  # Followers are healthy without a scheduler; the leader sends reminders
+        return bool(rsvp_cog and rsvp_cog.reminder_task.is_running())
+
+    async def report(self, db_ok=None, reminders_ok=None):
+        """Record component state and update presence only when something actually changed."""
+        if db_ok is not None and db_ok != self.db_ok:
+            log.log(logging.INFO if db_ok else logging.WARNING, f"[Health] Database {'connected' if db_ok else 'UNREACHABLE'}.")
+            self.db_ok = db_ok
+        if reminders_ok is not None and reminders_ok != self.reminders_ok:
+            log.log(logging.INFO if reminders_ok else logging.WARNING, f"[Health] Reminder scheduler {'running' if reminders_ok else 'STOPPED'}.")
+            self.reminders_ok = reminders_ok
+
+        status_message = ("🔔" if self.reminders_ok else "🔕") + ("📊" if self.db_ok else "⚠️")
+        if status_message == self.presence:
+            return
+        try:
+            activity = discord.Activity(type=discord.ActivityType.watching, name=status_message)
+            await self.bot.change_presence(activity=activity)
+            self.presence = status_message
+            log.info(f"[Health] Status updated to: {status_message}")
+        except Exception as e:
+            log.error(f"[Health] Error updating status: {e}")
+
+    @tasks.loop(seconds=30)
+    @instrument_loop("check_health")
+    async def check_health(self):
+        """Poll cheap in-process state and, when the pool has been idle, the database."""
+        await self.report(db_ok=await self.check_database(), reminders_ok=self.check_reminders())
+
+    @check_health.before_loop
+    async def before_check_health(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot):
+    await bot.add_cog(HealthMonitor(bot))
@@ -1,24 +1,30 @@
+import logging
 import discord
 from discord.ext import commands
 from datetime import datetime, timedelta, timezone
-from PIL import Image, ImageDraw, ImageFont
-import qrcode
-import os
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
+from utils.leader import leads
+from utils.qr_render import QRRenderer
 
+log = logging.getLogger(__name__)
 
 class InviteSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.cursor = bot.cursor
-        self.conn = bot.conn
+        self.invites = bot.storage.invites
         self.PST = timezone(timedelta(hours=-8))
         self.events_channel_id = 1325380437048299593  # Replace with your events channel ID
+        self.render_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="qr-render")  # Keeps QR rendering off the event loop
+        self.renderer = QRRenderer()  # Caches fonts and the static title layer between invites
+
+    def cog_unload(self):
+        self.render_pool.shutdown(wait=False)
 
     @commands.Cog.listener()
     async def on_message(self, message):
         """Delete any message in the events channel that isn't the !newevent command."""
-        if message.channel.id != self.events_channel_id:
+        if message.channel.id != self.events_channel_id or not leads(self.bot):
             return
 
         if message.author == self.bot.user:
@@ -31,7 +37,7 @@ class InviteSystem(commands.Cog):
         try:
             await message.author.send(f"Only the !newevent command is allowed in {message.channel.mention}.")
         except discord.Forbidden:
-            print(f"Could not send a DM to {message.author}. They might have DMs disabled.")
+            log.warning(f"Could not send a DM to {message.author}. They might have DMs disabled.")
 
         # Wait briefly before deleting the message to ensure the DM is sent
         await asyncio.sleep(1)
@@ -41,10 +47,11 @@ class InviteSystem(commands.Cog):
     async def on_raw_reaction_add(self, payload):
         if payload.user_id == self.bot.user.id:
             return
+        if not leads(self.bot):
+            return  # The leader creates the invite; a second instance would send a second QR code
 
-        self.cursor.execute("SELECT message_id, channel_id FROM embeds WHERE id = 'central'")
-        row = self.cursor.fetchone()
-        if row and payload.message_id == row[0]:
+        # Reject reactions on anything but the central embed without touching the database
+        if self.bot.embeds.find(payload.message_id) == 'central':
             guild = self.bot.get_guild(payload.guild_id)
             user = guild.get_member(payload.user_id)
             if user:
@@ -57,71 +64,39 @@ class InviteSystem(commands.Cog):
         # Check if the user is an admin
         if user.guild_permissions.administrator:
             invite = await guild.text_channels[0].create_invite(max_uses=1, unique=True, max_age=86400)
-            img_path = self.create_qr_image(invite.url, user_id)
+            image = await self.create_qr_image(invite.url)
 
             await user.send(
                 content=f"Here is your one-time invite QR code.\n\nDirect link: {invite.url}",
-                file=discord.File(img_path)
+                file=discord.File(image, filename=f"invite_{user_id}.png")
             )
-            os.remove(img_path)
             return
 
         # Non-admin users must wait 30 days between invites
-        self.cursor.execute("SELECT last_invite FROM invites WHERE user_id = %s", (user_id,))
-        result = self.cursor.fetchone()
-        if result and (current_time - result[0].replace(tzinfo=None)).days < 30:
+        result = await self.invites.last_invite(user_id)
+        if result and (current_time - result.replace(tzinfo=None)).days < 30:
             await user.send("You can only generate a new invite QR code every 30 days.")
             return
 
         invite = await guild.text_channels[0].create_invite(max_uses=1, unique=True, max_age=86400)
-        img_path = self.create_qr_image(invite.url, user_id)
+        image = await self.create_qr_image(invite.url)
 
         await user.send(
             content=f"Here is your one-time invite QR code.\n\nDirect link: {invite.url}",
-            file=discord.File(img_path)
-        )
-        os.remove(img_path)
-
-        self.cursor.execute('''
-            INSERT INTO invites (user_id, last_invite, invite_url) VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE last_invite = VALUES(last_invite), invite_url = VALUES(invite_url)
-        ''', (user_id, current_time, invite.url))
-        self.conn.commit()
-
-    def create_qr_image(self, data, user_id):
-        """Generate a static PNG QR code with text overlay."""
-        invite_code = data.split("https://")[-1]
-
-        # Create QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
+            file=discord.File(image, filename=f"invite_{user_id}.png")
         )
-        qr.add_data(data)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="#00FFE4", back_color="black").convert("RGBA")
-
-        # Add text overlay
-        draw = ImageDraw.Draw(img)
-        font_title = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 28)
-        font_code = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 22)
-
-        # Title text
-        title_text = "DARKNET"
-        title_x = (img.width - draw.textlength(title_text, font=font_title)) // 2
-        draw.text((title_x, 10), title_text, font=font_title, fill="#00FFE4")
-
-        # Invite code text
-        code_text = f"{invite_code}"
-        code_x = (img.width - draw.textlength(code_text, font=font_code)) // 2
-        draw.text((code_x, img.height - 40), code_text, font=font_code, fill="#00FFE4")
-
-        # Save image
-        img_path = f"invite_{user_id}.png"
-        img.save(img_path)
-        return img_path
+
+        await self.invites.record(user_id, current_time, invite.url, str(user))
+
+        # Keep the invite board counters current without a COUNT(*) on every refresh
+        stats = getattr(self.bot, "invite_stats", None)
+        if stats:
+            stats.invite_created(str(user), new_row=result is None)
+
+    async def create_qr_image(self, data):
+        """Render the invite QR code on the worker pool and return it as an in-memory PNG."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.render_pool, self.renderer.render, data)
 
 
 async def setup(bot):
@@ -1,8 +1,19 @@
+import logging
 import discord
 from discord.ext import commands, tasks
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta
 import pytz
 import asyncio
+from utils.fanout import GLOBAL_RATE_LIMIT, DMFanout
+from utils.leader import leads
+from utils.metrics import REMINDER_LATENESS_SECONDS, instrument_loop
+from utils.models import Event
+from utils.outbox import OutboxWorker
+from utils.rsvp_queue import RSVPWriteBehind
+from utils.scheduler import ReminderScheduler
+from utils.sharding import local_shards, owns_guild, shard_share
+
+log = logging.getLogger(__name__)
 
 PST = pytz.timezone('America/Los_Angeles')
 UTC = pytz.utc
@@ -10,126 +21,191 @@ UTC = pytz.utc
 class RSVPCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.reminders = []  # List of reminders: [(reminder_time, channel_id, message_id, event_data)]
-        self.event_messages = {}  # Track event embeds (message_id -> channel_id)
+        self.scheduler = ReminderScheduler()  # Pending reminders keyed by event_id (event_id -> Event)
+        self.events = {}  # In-memory event index (message_id -> Event) for the reaction hot path
+        self.last_event_id = 0  # High-water mark: highest event_id the database has been read up to
+        self.rsvp_users = {}  # Stored RSVP user ids per event (event_id -> set), loaded by the startup resync
+        self.rsvp_loading = {}  # In-flight RSVP set loads (event_id -> future), shared by concurrent reactions
+        self.rsvp_queue = RSVPWriteBehind(bot.storage.rsvps)  # Batches RSVP inserts instead of one commit per reaction
+        # Concurrent, rate-limit aware reminder DMs; processes running other shards share the token's global limit
+        self.fanout = DMFanout(concurrency=10, rate=GLOBAL_RATE_LIMIT * shard_share(bot))
+        self.fanout_tasks = set()  # In-flight reminder deliveries
+        # Sends queued reminder DMs for events on this process's shards
+        self.outbox_worker = OutboxWorker(
+            bot.storage.outbox, self.fanout, bot.get_user,
+            fetch_user=getattr(bot, "fetch_user", None), shards=lambda: local_shards(bot),
+        )
+        self.outbox_retention = timedelta(days=30)  # How long finished deliveries stay in the outbox
+        self.leader = getattr(bot, "leader", None)  # Lease shared with redundant instances; None runs standalone
+        self.promotion = None  # Pending reload before this instance starts leading
         # Start tasks
+        # The event index, reactions, reminders and cleanup belong to the leader; followers hold no events until promoted
+        if leads(bot):
+            self.start_leader_tasks()
+        if self.leader is not None:
+            self.leader.listeners.append(self.on_leadership)
 
         try:
-            print("Attempting to start reminder task...")
-            if self.reminder_task.is_running():
-                self.reminder_task.stop()
-            self.reminder_task.start()
-            print("Reminder task started.")
+            log.debug("Attempting to start time logger task...")
+            if self.time_logger_task.is_running():
+                self.time_logger_task.stop()
+            self.time_logger_task.start()
+            log.debug("Time logger task started.")
         except Exception as e:
-            print(f"Failed to start reminder task: {e}")
+            log.error(f"Failed to start time logger task: {e}")
 
-        try:
-            print("Attempting to start cleanup task...")
-            if self.cleanup_task.is_running():
-                self.cleanup_task.stop()
-            self.cleanup_task.start()
-            print("Cleanup task started.")
-        except Exception as e:
-            print(f"Failed to start cleanup task: {e}")
+        log.info("RSVPCog initialized and tasks started.")
 
+    def start_leader_tasks(self):
         try:
-            print("Attempting to start event monitor task...")
+            log.debug("Attempting to start event monitor task...")
             if self.event_monitor_task.is_running():
                 self.event_monitor_task.stop()
             self.event_monitor_task.start()
-            print("Event monitor task started.")
+            log.debug("Event monitor task started.")
         except Exception as e:
-            print(f"Failed to start event monitor task: {e}")
+            log.error(f"Failed to start event monitor task: {e}")
 
         try:
-            print("Attempting to start time logger task...")
-            if self.time_logger_task.is_running():
-                self.time_logger_task.stop()
-            self.time_logger_task.start()
-            print("Time logger task started.")
+            log.debug("Attempting to start reminder task...")
+            if self.reminder_task.is_running():
+                self.reminder_task.stop()
+            self.reminder_task.start()
+            log.debug("Reminder task started.")
         except Exception as e:
-            print(f"Failed to start time logger task: {e}")
+            log.error(f"Failed to start reminder task: {e}")
 
         try:
-            print("Attempting to start status update task...")
-            if self.update_status_task.is_running():
-                self.update_status_task.stop()
-            self.update_status_task.start()
-            print("Status update task started.")
+            log.debug("Attempting to start cleanup task...")
+            if self.cleanup_task.is_running():
+                self.cleanup_task.stop()
+            self.cleanup_task.start()
+            log.debug("Cleanup task started.")
         except Exception as e:
-            print(f"Failed to start status update task: {e}")
+            log.error(f"Failed to start cleanup task: {e}")
+
+        self.outbox_worker.start()
 
-        print("RSVPCog initialized and tasks started.")
+    def stop_leader_tasks(self):
+        if self.event_monitor_task.is_running():
+            self.event_monitor_task.cancel()
+        if self.reminder_task.is_running():
+            self.reminder_task.cancel()
+        if self.cleanup_task.is_running():
+            self.cleanup_task.cancel()
+        # Reminders being queued are not marked as sent yet, so the new leader queues them again
+        for task in list(self.fanout_tasks):
+            task.cancel()
+        self.outbox_worker.stop()  # Unsent rows are released for the new leader's worker
+        self.forget_events()
+
+    def forget_events(self):
+        """Drop the in-memory event index; a follower holds none and reloads it when promoted."""
+        self.scheduler.clear()
+        self.events.clear()
+        self.rsvp_users.clear()
+        self.last_event_id = 0
+
+    def on_leadership(self, is_leader):
+        """Lease listener: take over reminders and cleanup when elected, hand them back when demoted."""
+        if is_leader:
+            if self.promotion is None or self.promotion.done():
+                self.promotion = asyncio.create_task(self.promote())
+        else:
+            self.stop_leader_tasks()
+            log.info("Stepped down: reminder and cleanup tasks stopped, event index dropped.")
+
+    async def promote(self):
+        # The previous leader may have sent reminders since we loaded, so start from the database's view
+        await self.load_rsvp_events()
+        if self.leader.is_leader:
+            self.start_leader_tasks()
+            log.info("Elected leader: reminder and cleanup tasks started.")
+            # Pick up RSVPs made while no instance was handling reactions
+            await self.sync_reactions_on_startup()
     
-    async def sync_reactions_on_startup(self):
+    async def sync_reactions_on_startup(self, concurrency=8):
         """Check existing messages for reactions and silently update RSVPs."""
-        cursor = self.bot.conn.cursor()
-        cursor.execute("""
-            SELECT message_id, channel_id, event_id FROM events 
-            WHERE reminder_sent = 0 AND event_date >= CURRENT_DATE()
-        """)
-        events = cursor.fetchall()
-        print(f"Found {len(events)} events to process for RSVP synchronization.")
-        for event in events:
-            message_id, channel_id, event_id = event
-            channel = self.bot.get_channel(channel_id)
-            if channel:
-                try:
-                    message = await channel.fetch_message(message_id)
-                    for reaction in message.reactions:
-                        if str(reaction.emoji) == '✅':  # Checking for the RSVP emoji
-                            async for user in reaction.users():
-                                if not user.bot:
-                                    await self.add_rsvp_if_not_exists(event_id, user.id, silent=True)
-                except discord.NotFound:
-                    print(f"Message {message_id} not found in channel {channel_id}.")
-                except Exception as e:
-                    print(f"Error processing reactions for message {message_id}: {e}")
-
-    async def add_rsvp_if_not_exists(self, event_id, user_id, silent=False):
-        """Add an RSVP for a user if it doesn't already exist, optionally silently."""
-        cursor = self.bot.conn.cursor()
-        cursor.execute("SELECT 1 FROM rsvp_users WHERE event_id = %s AND user_id = %s", (event_id, user_id))
-        if cursor.fetchone() is None:
-            cursor.execute("INSERT INTO rsvp_users (event_id, user_id, rsvp_time) VALUES (%s, %s, %s)", 
-                           (event_id, user_id, datetime.now(UTC)))
-            self.bot.conn.commit()
-            if not silent:
-                user = self.bot.get_user(user_id)
-                if user:
-                    try:
-                        await user.send("Thank you for RSVPing to the event!")
-                    except discord.Forbidden:
-                        print(f"Could not send DM to {user_id}.")
-            else:
-                print(f"Silently added RSVP for user {user_id} to event {event_id}.")
-        
-    @tasks.loop(seconds=9)
-    async def update_status_task(self):
-        """Update bot status to reflect reminder loop and SQL connection status."""
-        try:
-            # Check reminder loop status
-            reminder_status = "🔔" if self.reminder_task.is_running() else "🔕"
+        events = await self.owned(await self.bot.storage.events.upcoming_messages(datetime.now(PST).date()))
+        log.info(f"Found {len(events)} events to process for RSVP synchronization.")
+        if not events:
+            return
 
-            # Check SQL connection status
+        # Load the stored RSVP sets for every event in one query so reactions are diffed in memory
+        event_ids = [event["event_id"] for event in events]
+        rows = await self.bot.storage.rsvps.for_events(event_ids)
+        for event_id in event_ids:
+            self.rsvp_users[event_id] = set()
+        for event_id, user_id in rows:
+            self.rsvp_users[event_id].add(user_id)
+
+        # Fetch event messages concurrently, bounded so startup doesn't burst the API
+        semaphore = asyncio.Semaphore(concurrency)
+        results = await asyncio.gather(*(
+            self.sync_event_reactions(event["message_id"], event["channel_id"], event["event_id"], semaphore)
+            for event in events
+        ))
+        log.info(
+            f"RSVP synchronization finished: {results.count('unchanged')} unchanged, "
+            f"{results.count('synced')} synced, {results.count('skipped')} skipped."
+        )
+
+    async def sync_event_reactions(self, message_id, channel_id, event_id, semaphore):
+        """Reconcile one event's ✅ reactions with its stored RSVPs using batched writes."""
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            return "skipped"
+
+        async with semaphore:
             try:
-                self.bot.conn.ping(reconnect=True, attempts=3, delay=5)
-                sql_status = "📊"
+                message = await channel.fetch_message(message_id)
+                reaction = next((r for r in message.reactions if str(r.emoji) == '✅'), None)  # The RSVP emoji
+                stored = self.rsvp_users[event_id]
+                # Live reactions keep adding to stored while users are paged in; only these may be removed
+                snapshot = set(stored)
+
+                # The reaction count (minus our own) matching the stored set means nothing changed while offline
+                reacting = (reaction.count - (1 if reaction.me else 0)) if reaction else 0
+                if reacting == len(snapshot):
+                    return "unchanged"
+
+                current = set()
+                if reaction:
+                    async for user in reaction.users():
+                        if not user.bot:
+                            current.add(user.id)
+            except discord.NotFound:
+                log.warning(f"Message {message_id} not found in channel {channel_id}.")
+                return "skipped"
             except Exception as e:
-                sql_status = "⚠️"
-                print(f"[SQL Connection Check] Failed: {e}")
-
-            # Alternate status display
-            status_message = reminder_status if datetime.now().second % 2 == 0 else sql_status
+                log.error(f"Error processing reactions for message {message_id}: {e}")
+                return "skipped"
 
-            # Set activity with status message
-            activity = discord.Activity(type=discord.ActivityType.watching, name=status_message)
-            await self.bot.change_presence(activity=activity)
-            print(f"[Status Task] Status updated to: {status_message}")
+        added = current - stored
+        removed = snapshot - current
+        try:
+            if added:
+                now_utc = datetime.now(UTC)
+                await self.bot.storage.rsvps.add_many([(event_id, user_id, now_utc) for user_id in added])
+            if removed:
+                await self.bot.storage.rsvps.remove(event_id, removed)
         except Exception as e:
-            print(f"[Status Task] Error updating status: {e}")
-            
-    def cog_unload(self):
+            log.error(f"Error saving synchronized RSVPs for event {event_id}: {e}")
+            return "skipped"
+
+        stored |= added
+        stored -= removed
+        log.info(f"Synchronized RSVPs for event {event_id}: +{len(added)} / -{len(removed)}.")
+        return "synced"
+
+    async def cog_load(self):
+        self.rsvp_queue.start()
+
+    async def cog_unload(self):
+        if self.leader is not None and self.on_leadership in self.leader.listeners:
+            self.leader.listeners.remove(self.on_leadership)
+        if self.promotion is not None:
+            self.promotion.cancel()
         if self.reminder_task.is_running():
             self.reminder_task.cancel()
         if self.cleanup_task.is_running():
@@ -138,328 +214,331 @@ class RSVPCog(commands.Cog):
             self.event_monitor_task.cancel()
         if self.time_logger_task.is_running():
             self.time_logger_task.cancel()
-        if self.update_status_task.is_running():
-            self.update_status_task.cancel()
-        print("RSVPCog tasks unloaded.")
-
-    def ensure_datetime(self, value):
-        """Ensure the value is a datetime object."""
-        if isinstance(value, datetime):
-            if value.tzinfo is None:  # If naive, assume UTC
-                return value.replace(tzinfo=UTC)
-            return value
-        if isinstance(value, str):
-            dt = datetime.fromisoformat(value)
-            return dt if dt.tzinfo else dt.replace(tzinfo=UTC)  # Assume UTC if naive
-        if isinstance(value, date):  # Handle date type
-            return datetime.combine(value, datetime.min.time(), UTC)
-        if isinstance(value, timedelta):  # Handle timedelta type
-            return datetime.min + value
-        if value is None:
-            raise ValueError("Encountered None when expecting a datetime string or object.")
-        raise TypeError(f"Unsupported type for datetime conversion: {type(value)}")
+        await self.outbox_worker.close()
+        await self.rsvp_queue.close()  # Flush RSVPs that are still waiting to be written
+        log.info("RSVPCog tasks unloaded.")
 
     async def load_rsvp_events(self):
         """Load existing events and reminders into memory at startup."""
-        cursor = self.bot.conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT *
-            FROM events
-            WHERE reminder_sent = false
-        """)
-        events = cursor.fetchall()
-
-        print("Loading RSVP events from the database...")
-        self.reminders.clear()  # Clear existing reminders to avoid duplication
-        for event in events:
-            try:
-                reminder_time = self.ensure_datetime(event["reminder_time"])
-                event_data = {
-                    "event_id": event["event_id"],
-                    "name": event["name"],
-                    "crew_name": event["crew_name"],
-                    "flyer": event["flyer_url"],
-                    "crew_logo": event["crew_logo_url"],
-                    "location": event["location"],
-                    "date": self.ensure_datetime(event["event_date"]),
-                    "start_time": self.ensure_datetime(event["start_time"]),
-                    "end_time": self.ensure_datetime(event["end_time"]),
-                    "age_requirement": event["age_requirement"],
-                    "cover_fee": event["cover_fee"],
-                    "info": event["contact_info"],
-                    "type": event["event_type"],
-                }
-                self.reminders.append((reminder_time, event["channel_id"], event["message_id"], event_data))
-                self.event_messages[event["message_id"]] = event["channel_id"]
-                print(f"Loaded event: {event_data['name']} (Message ID: {event['message_id']}, Reminder Time: {reminder_time})")
-            except Exception as e:
-                print(f"Error loading event ID {event['event_id']}: {e}")
+        # Read the high-water mark first so an event inserted while loading is never skipped.
+        self.last_event_id = max(self.last_event_id, await self.bot.storage.events.max_id())
 
-        print(f"Finished loading {len(self.reminders)} reminders into memory.")
+        events = await self.owned(await self.bot.storage.events.pending())
 
-    async def register_event(self, message_id, channel_id, reminder_time, event_data):
+        log.info("Loading RSVP events from the database...")
+        self.scheduler.clear()  # Clear existing reminders to avoid duplication
+        for row in events:
+            try:
+                event = Event.from_row(row)
+                self.track_event(event)
+                log.debug("Loaded event: %s (Message ID: %s, Reminder Time: %s)", event.name, event.message_id, event.reminder_time)
+            except Exception as e:
+                log.error(f"Error loading event ID {row['event_id']}: {e}")
+
+        log.info(f"Finished loading {len(self.scheduler)} reminders into memory.")
+
+    async def owned(self, rows):
+        """The event rows whose guild is on one of this process's shards.
+
+        Rows saved before guild_id was recorded get it from the flyer's
+        channel, which is only cached by the process owning that guild,
+        and it is written back so the lookup happens once.
+        """
+        backfill = {}
+        for row in rows:
+            if row["guild_id"] is None:
+                channel = self.bot.get_channel(row["channel_id"])
+                if channel is not None:
+                    row["guild_id"] = backfill[row["event_id"]] = channel.guild.id
+        if backfill:
+            await self.bot.storage.events.set_guilds(backfill)
+            log.info(f"Recorded the guild of {len(backfill)} event(s) saved before sharding.")
+        return [row for row in rows if owns_guild(self.bot, row["guild_id"])]
+
+    def track_event(self, event):
+        """Add an event to the message index and schedule its reminder."""
+        self.events[event.message_id] = event
+        self.scheduler.schedule(event.event_id, event.reminder_time, event)
+
+    def untrack_event(self, message_id):
+        """Forget an event that has ended so reactions on it are ignored."""
+        event = self.events.pop(message_id, None)
+        if event:
+            self.scheduler.cancel(event.event_id)
+            self.rsvp_users.pop(event.event_id, None)
+        return event
+
+    async def register_event(self, event):
         """Register a new event dynamically."""
-        self.event_messages[message_id] = channel_id
-        self.reminders.append((reminder_time, channel_id, message_id, event_data))
-        print(f"New event registered: {event_data['name']} (Message ID: {message_id})")
+        if not owns_guild(self.bot, event.guild_id) or not leads(self.bot):
+            return  # Another process owns this guild's shard or leads; its event monitor picks the event up
+        self.track_event(event)
+        log.info(f"New event registered: {event.name} (Message ID: {event.message_id})")
+
+    async def load_rsvp_users(self, event_id):
+        """Load an event's stored RSVPs once; concurrent reactions share the same query."""
+        loading = self.rsvp_loading.get(event_id)
+        if loading is None:
+            loading = self.rsvp_loading[event_id] = asyncio.ensure_future(self.bot.storage.rsvps.user_ids(event_id))
+        try:
+            user_ids = await asyncio.shield(loading)
+        finally:
+            if loading.done():
+                self.rsvp_loading.pop(event_id, None)
+        return self.rsvp_users.setdefault(event_id, set(user_ids))
 
     async def register_rsvp(self, event_id, user_id):
-        """Save RSVP details to the database."""
-        cursor = self.bot.conn.cursor(dictionary=True)
+        """Queue an RSVP for the next batched write, skipping users who already RSVP'd."""
         try:
-            # Check if the user has already RSVP'd
-            cursor.execute("""
-                SELECT * FROM rsvp_users
-                WHERE event_id = %s AND user_id = %s
-            """, (event_id, user_id))
-            existing_rsvp = cursor.fetchone()
-
-            if existing_rsvp:
-                print(f"User {user_id} has already RSVP'd to event {event_id}. Skipping duplicate entry.")
+            # Check if the user has already RSVP'd against the in-memory set (loaded once per event)
+            known = self.rsvp_users.get(event_id)
+            if known is None:
+                known = await self.load_rsvp_users(event_id)
+
+            if user_id in known:
+                log.debug("User %s has already RSVP'd to event %s. Skipping duplicate entry.", user_id, event_id)
                 # Notify the user about the duplicate RSVP
                 user = self.bot.get_user(user_id)
                 if user:
                     try:
                         await user.send("You have already RSVP'd to this event!")
                     except discord.Forbidden:
-                        print(f"Unable to notify user {user_id} about duplicate RSVP.")
+                        log.debug("Unable to notify user %s about duplicate RSVP.", user_id)
                 return
 
-            # Insert new RSVP
-            cursor.execute("""
-                INSERT INTO rsvp_users (event_id, user_id, rsvp_time)
-                VALUES (%s, %s, %s)
-            """, (event_id, user_id, datetime.now(UTC)))
-            self.bot.conn.commit()
-            print(f"User {user_id} RSVP'd to event {event_id}.")
+            # Queue new RSVP; the write-behind queue inserts it with the next batch
+            known.add(user_id)
+            self.rsvp_queue.add(event_id, user_id)
+            log.debug("User %s RSVP'd to event %s.", user_id, event_id)
         except Exception as e:
-            print(f"Failed to save RSVP for user {user_id} to event {event_id}: {e}")
+            log.error(f"Failed to save RSVP for user {user_id} to event {event_id}: {e}")
 
-    @tasks.loop(seconds=59)
+    @tasks.loop()
     async def reminder_task(self):
-        """Send reminders for events."""
-        print("[Reminder Task] Task initiated and running.")
+        """Sleep until the next reminder is due, then send it."""
+        due_events = await self.scheduler.wait_for_due()
+        now_utc = datetime.now(UTC)
+        log.info(f"[Reminder Task] {len(due_events)} reminder(s) due at {now_utc}. {len(self.scheduler)} still pending.")
+        for event in due_events:
+            REMINDER_LATENESS_SECONDS.observe(max(0.0, (now_utc - event.reminder_time).total_seconds()))
+            # Each event fans out in the background so one large party never delays the next reminder.
+            task = asyncio.create_task(self.send_event_reminders(event))
+            self.fanout_tasks.add(task)
+            task.add_done_callback(self.fanout_tasks.discard)
+
+    async def send_event_reminders(self, event):
+        """Queue a reminder DM for every RSVP'd user in the outbox and mark the event's reminder as sent."""
         try:
-            now_utc = datetime.now(UTC)
-            print(f"[Reminder Task] Current Time (UTC): {now_utc}")
+            log.info(f"[Reminder Task] Sending reminders for event: {event.name} (Event ID: {event.event_id})")
+
+            # Make sure queued RSVPs are written before reading the list
+            await self.rsvp_queue.flush()
+
+            # Fetch RSVP users for the event dynamically
+            rsvp_users = await self.bot.storage.rsvps.user_ids(event.event_id)
 
-            if not self.reminders:
-                print("[Reminder Task] No reminders currently loaded.")
+            if rsvp_users:
+                content = f"Reminder: The event '{event.name}' is happening soon! Here are the details:\n\n{event.details()}"
+                # Start from the upper bound so deliveries recorded while queueing can't finish the job early
+                progress = self.fanout.track(event.event_id, len(rsvp_users))
+                # Queueing is idempotent per user, so a restart before the event is marked below never duplicates DMs
+                progress.set_total(await self.queue_reminders(event, rsvp_users, content))
+                log.info(f"[Reminder Task] Queued {progress.total} reminder(s) for Event '{event.name}'.")
             else:
-                print(f"[Reminder Task] Processing {len(self.reminders)} reminders.")
-
-            reminders_to_remove = []
-            for reminder in self.reminders:
-                reminder_time_utc, channel_id, message_id, event_data = reminder
-                if now_utc >= reminder_time_utc and not event_data.get("reminder_sent", False):
-                    print(f"[Reminder Task] Sending reminders for event: {event_data['name']} (Event ID: {event_data['event_id']})")
-
-                    # Fetch RSVP users for the event dynamically
-                    cursor = self.bot.conn.cursor(dictionary=True)
-                    cursor.execute("""
-                        SELECT user_id
-                        FROM rsvp_users
-                        WHERE event_id = %s
-                    """, (event_data["event_id"],))
-                    rsvp_users = cursor.fetchall()
-
-                    if rsvp_users:
-                        for user in rsvp_users:
-                            user_id = user["user_id"]
-                            member = self.bot.get_user(user_id)
-                            if member:
-                                try:
-                                    start_time_pst = event_data["start_time"].astimezone(PST)
-                                    await member.send(
-                                        f"Reminder: The event '{event_data['name']}' is happening soon! Here are the details:\n\n"
-                                        f"**Location**: {event_data['location']}\n"
-                                        f"**Date**: {start_time_pst.strftime('%m-%d-%Y')}\n"
-                                        f"**Start Time**: {start_time_pst.strftime('%I:%M %p')} PST\n"
-                                        f"**Contact Info**: {event_data['info']}"
-                                    )
-                                    print(f"Reminder sent to {member.name} for Event: {event_data['name']}")
-                                except discord.Forbidden:
-                                    print(f"Failed to send reminder to {member.name}. DMs might be disabled.")
-                    else:
-                        print(f"No RSVP users found for Event ID: {event_data['event_id']}")
-
-                    # Mark reminder as sent in the database
-                    cursor.execute("UPDATE events SET reminder_sent = true WHERE event_id = %s", (event_data["event_id"],))
-                    self.bot.conn.commit()
-
-                    reminders_to_remove.append(reminder)
-
-            for reminder in reminders_to_remove:
-                self.reminders.remove(reminder)
-                print(f"[Reminder Task] Reminder removed for Event: {reminder[3]['name']}")
+                log.info(f"No RSVP users found for Event ID: {event.event_id}")
 
+            # Mark reminder as sent in the database; the outbox worker delivers the queued DMs
+            await self.bot.storage.events.mark_reminder_sent(event.event_id)
+            log.info(f"[Reminder Task] Reminder removed for Event: {event.name}")
         except Exception as e:
-            print(f"[Reminder Task] Encountered an error: {e}")
+            log.exception(f"[Reminder Task] Encountered an error for event {event.event_id}: {e}")
+
+    async def queue_reminders(self, event, user_ids, content):
+        """Add reminder DMs to the outbox, at most one per user and event; returns how many were new."""
+        now_utc = datetime.now(UTC)
+        queued = await self.bot.storage.outbox.enqueue(
+            [(event.event_id, event.guild_id, user_id, "reminder", content, now_utc, now_utc) for user_id in user_ids]
+        )
+        self.outbox_worker.wake()
+        return queued
+
+    @commands.command(name="reminder_status")
+    async def reminder_status(self, ctx):
+        """Show delivery progress for running and recently finished reminder fan-outs."""
+        if not self.fanout.progress:
+            await ctx.send("No reminder deliveries have run yet.")
+            return
+        lines = [f"Event {key}: {progress}" for key, progress in self.fanout.progress.items()]
+        await ctx.send("\n".join(lines))
 
     @tasks.loop(minutes=5)
+    @instrument_loop("cleanup_task")
     async def cleanup_task(self):
         """Delete event messages from Discord after the event has ended."""
         now_utc = datetime.now(UTC)
-        cursor = self.bot.conn.cursor(dictionary=True)
 
         try:
-            # Fetch events where the end_time has passed
-            cursor.execute("""
-                SELECT event_id, message_id, channel_id, name, end_time
-                FROM events
-                WHERE end_time <= %s
-            """, (now_utc,))
+            await self.bot.storage.outbox.purge(now_utc - self.outbox_retention)
+        except Exception as e:
+            log.error(f"[Cleanup Task] Failed to purge old outbox deliveries: {e}")
 
-            expired_events = cursor.fetchall()
+        try:
+            # Only events that ended and were not cleaned up yet, so each flyer is handled exactly once
+            expired_events = await self.owned(await self.bot.storage.events.expired(now_utc))
+            if not expired_events:
+                return
 
+            by_channel = {}
             for event in expired_events:
-                channel = self.bot.get_channel(event["channel_id"])
+                by_channel.setdefault(event["channel_id"], []).append(event)
+
+            processed = []
+            for channel_id, events in by_channel.items():
+                channel = self.bot.get_channel(channel_id)
                 if channel:
-                    try:
-                        # Fetch the message and delete it
-                        message = await channel.fetch_message(event["message_id"])
-                        await message.delete()
-                        print(f"Deleted event message: {event['name']} (Message ID: {event['message_id']})")
-                    except discord.NotFound:
-                        print(f"Message not found for event: {event['name']} (Message ID: {event['message_id']}).")
-                    except discord.Forbidden:
-                        print(f"Permission denied to delete message for event: {event['name']} (Message ID: {event['message_id']}).")
-                    except Exception as e:
-                        print(f"Unexpected error while deleting message for event {event['name']}: {e}")
+                    processed.extend(await self.delete_flyers(channel, events))
+                else:
+                    processed.extend(events)  # Channel is gone, nothing left to delete
 
-                # Optionally mark the event as processed
-                cursor.execute("UPDATE events SET reminder_sent = true WHERE event_id = %s", (event["event_id"],))
-                self.bot.conn.commit()
+            if processed:
+                await self.bot.storage.events.mark_cleaned_up(event["event_id"] for event in processed)
+                for event in processed:
+                    self.untrack_event(event["message_id"])
+            log.info(f"[Cleanup Task] Cleaned up {len(processed)} of {len(expired_events)} expired event(s).")
 
         except Exception as e:
-            print(f"[Cleanup Task] Error during cleanup: {e}")
+            log.exception(f"[Cleanup Task] Error during cleanup: {e}")
+
+    async def delete_flyers(self, channel, events):
+        """Delete expired flyers in one channel without fetching them first; returns the events handled."""
+        # Bulk delete only accepts messages younger than 14 days (with a margin for clock skew)
+        bulk_cutoff = datetime.now(UTC) - timedelta(days=14) + timedelta(minutes=5)
+        recent, older = [], []
+        for event in events:
+            (recent if discord.utils.snowflake_time(event["message_id"]) > bulk_cutoff else older).append(event)
+        processed = []
+
+        for start in range(0, len(recent), 100):
+            chunk = recent[start:start + 100]
+            try:
+                await channel.delete_messages([discord.Object(id=e["message_id"]) for e in chunk])
+                processed.extend(chunk)
+                log.info(f"Bulk deleted {len(chunk)} event message(s) in channel {channel.id}.")
+            except discord.HTTPException as e:
+                # e.g. a message in the batch was already removed; fall back to one-by-one deletes
+                log.warning(f"Bulk delete failed in channel {channel.id} ({e}); deleting individually.")
+                older.extend(chunk)
+
+        for event in older:
+            try:
+                await channel.get_partial_message(event["message_id"]).delete()
+                log.debug("Deleted event message: %s (Message ID: %s)", event['name'], event['message_id'])
+            except discord.NotFound:
+                log.warning(f"Message not found for event: {event['name']} (Message ID: {event['message_id']}).")
+            except discord.Forbidden:
+                log.warning(f"Permission denied to delete message for event: {event['name']} (Message ID: {event['message_id']}).")
+            except Exception as e:
+                log.error(f"Unexpected error while deleting message for event {event['name']}: {e}")
+                continue  # Leave it for the next run
+            processed.append(event)
+
+        return processed
 
     @tasks.loop(seconds=30)
+    @instrument_loop("time_logger_task")
     async def time_logger_task(self):
-        """Log the current time every 30 seconds."""
-        while True:
-            now_utc = datetime.now(UTC)
-            now_pst = datetime.now(PST)
-            print(f"[Time Logger Task] Current Time (UTC): {now_utc}")
-            print(f"[Time Logger Task] Current Time (PST): {now_pst}")
-            await asyncio.sleep(30)
+        """Log the current time every 30 seconds (debug level)."""
+        log.debug("[Time Logger Task] Current Time (UTC): %s / (PST): %s", datetime.now(UTC), datetime.now(PST))
 
     @tasks.loop(minutes=1)
+    @instrument_loop("event_monitor_task")
     async def event_monitor_task(self):
-        """Check for new events and add them to memory."""
+        """Check for events inserted since the last poll and add them to memory."""
         try:
-            print("Monitoring for new events...")
-            cursor = self.bot.conn.cursor(dictionary=True)
-            existing_ids = tuple(self.event_messages.keys())
-            placeholder = ', '.join(['%s'] * len(existing_ids)) if existing_ids else 'NULL'
-            query = f"""
-                SELECT * FROM events
-                WHERE reminder_sent = false AND message_id NOT IN ({placeholder})
-            """
-            cursor.execute(query, existing_ids if existing_ids else ())
-            events = cursor.fetchall()
-
-            for event in events:
-                self.event_messages[event["message_id"]] = event["channel_id"]
-                event_data = {
-                    "event_id": event["event_id"],
-                    "name": event["name"],
-                    "crew_name": event["crew_name"],
-                    "flyer": event["flyer_url"],
-                    "crew_logo": event["crew_logo_url"],
-                    "location": event["location"],
-                    "date": self.ensure_datetime(event["event_date"]),
-                    "start_time": self.ensure_datetime(event["start_time"]),
-                    "end_time": self.ensure_datetime(event["end_time"]),
-                    "age_requirement": event["age_requirement"],
-                    "cover_fee": event["cover_fee"],
-                    "info": event["contact_info"],
-                    "type": event["event_type"],
-                }
-                reminder_time = self.ensure_datetime(event["reminder_time"])
-                self.reminders.append((reminder_time, event["channel_id"], event["message_id"], event_data))
-                print(f"New event added: {event_data['name']} (Message ID: {event['message_id']})")
+            log.debug("Monitoring for new events after event_id %s...", self.last_event_id)
+            # Only rows past the high-water mark are read, so each poll is a primary key range scan
+            # whose cost depends on the number of new events, not on how many are already tracked.
+            rows = await self.bot.storage.events.pending(after_id=self.last_event_id)
+            if not rows:
+                return
+            # Advance past events owned by other shards too, so they are not read again next poll
+            self.last_event_id = max(self.last_event_id, rows[-1]["event_id"])
+
+            for row in await self.owned(rows):
+                if row["event_id"] in self.scheduler:
+                    continue  # Registered by new_event on this instance already
+                event = Event.from_row(row)
+                self.track_event(event)
+                log.info(f"New event added: {event.name} (Message ID: {event.message_id})")
         except Exception as e:
-            print(f"[Event Monitor Task] Encountered an error: {e}")
+            log.exception(f"[Event Monitor Task] Encountered an error: {e}")
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
         """Handle RSVP reactions."""
-        if payload.message_id in self.event_messages and str(payload.emoji) == "✅":
+        if not leads(self.bot):
+            return  # The leader records the RSVP and sends the confirmation
+        if payload.message_id in self.events and str(payload.emoji) == "✅":
             guild = self.bot.get_guild(payload.guild_id)
             member = guild.get_member(payload.user_id)
 
-            cursor = self.bot.conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT *
-                FROM events
-                WHERE message_id = %s
-            """, (payload.message_id,))
-            event = cursor.fetchone()
+            # Served from the in-memory index; a reaction costs no event lookup in the database.
+            event = self.events.get(payload.message_id)
 
             if event and member:
-                await self.register_rsvp(event["event_id"], payload.user_id)
+                await self.register_rsvp(event.event_id, payload.user_id)
 
                 # Check if the current time is past the reminder time
                 now_utc = datetime.now(UTC)
-                reminder_time = self.ensure_datetime(event["reminder_time"])
 
-                if now_utc >= reminder_time:
+                if now_utc >= event.reminder_time:
                     try:
-                        start_time_pst = self.ensure_datetime(event["start_time"]).astimezone(PST)
-                        await member.send(
-                            f"Reminder: The event '{event['name']}' is happening now or soon! Here are the details:\n\n"
-                            f"**Location**: {event['location']}\n"
-                            f"**Date**: {start_time_pst.strftime('%m-%d-%Y')}\n"
-                            f"**Start Time**: {start_time_pst.strftime('%I:%M %p')} PST\n"
-                            f"**Contact Info**: {event['contact_info']}"
+                        # Through the outbox, so re-reacting never sends the reminder a second time
+                        await self.queue_reminders(
+                            event, [member.id],
+                            f"Reminder: The event '{event.name}' is happening now or soon! Here are the details:\n\n"
+                            f"{event.details()}"
                         )
-                        print(f"Immediate RSVP reminder sent to {member.name} for Event: {event['name']}")
-                    except discord.Forbidden:
-                        print(f"Failed to send RSVP reminder to {member.name}. DMs might be disabled.")
+                        log.debug("Immediate RSVP reminder queued for %s for Event: %s", member.name, event.name)
+                    except Exception as e:
+                        log.error(f"Failed to queue RSVP reminder for {member.name}: {e}")
                 else:
                     try:
                         await member.send(
                             "You have successfully RSVPed to the event! We'll send you a reminder closer to the event date."
                         )
-                        print(f"RSVP confirmation sent to {member.name}.")
+                        log.debug("RSVP confirmation sent to %s.", member.name)
                     except discord.Forbidden:
-                        print(f"Failed to send RSVP confirmation to {member.name}. DMs might be disabled.")
+                        log.debug("Failed to send RSVP confirmation to %s. DMs might be disabled.", member.name)
                     
     @commands.command(name="test_reminder")
     async def test_reminder(self, ctx):
         """Test command to check upcoming reminders and RSVP users."""
         now_utc = datetime.now(UTC)
-        # Ensure all reminders are timezone-aware for comparison
-        upcoming_reminders = [reminder for reminder in self.reminders if reminder[0].astimezone(UTC) > now_utc]
+        next_reminder = self.scheduler.peek()
 
-        if not upcoming_reminders:
+        if not next_reminder:
             await ctx.send("No upcoming reminders found.")
             return
 
-        next_reminder = min(upcoming_reminders, key=lambda r: r[0])
-        time_until_next = next_reminder[0] - now_utc
+        reminder_time, event = next_reminder
+        time_until_next = reminder_time - now_utc
 
         # Fetch the RSVP users for the next reminder's event
-        cursor = self.bot.conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT user_id FROM rsvp_users
-            WHERE event_id = %s
-        """, (next_reminder[3]["event_id"],))
-        rsvp_users = cursor.fetchall()
+        rsvp_users = await self.bot.storage.rsvps.user_ids(event.event_id)
 
         # Fetch usernames for the RSVP users
         usernames = []
-        for user in rsvp_users:
-            discord_user = self.bot.get_user(int(user["user_id"]))
+        for user_id in rsvp_users:
+            discord_user = self.bot.get_user(int(user_id))
             if discord_user:
                 usernames.append(discord_user.name)
             else:
-                usernames.append(f"Unknown User ({user['user_id']})")
+                usernames.append(f"Unknown User ({user_id})")
 
         # Format the response
         response = (
-            f"The next reminder is for event: {next_reminder[3]['name']}\n"
+            f"The next reminder is for event: {event.name}\n"
             f"Time until next reminder: {time_until_next}\n"
             f"RSVP Users: {', '.join(usernames) if usernames else 'No users found.'}"
         )
@@ -467,7 +546,8 @@ class RSVPCog(commands.Cog):
         
 async def setup(bot):
     cog = RSVPCog(bot)
-    await cog.load_rsvp_events()
+    if leads(bot):
+        await cog.load_rsvp_events()
     await bot.add_cog(cog)
     bot.rsvp_cog = cog  # Expose RSVP Cog for interaction with other cogs
-    print("RSVPCog setup complete.")
\ No newline at end of file
+    log.info("RSVPCog setup complete.")
\ No newline at end of file
@@ -1,11 +1,19 @@
+import logging
 import discord
-from discord.ext import commands, tasks
-import mysql.connector
-from mysql.connector import Error
+from discord.ext import commands
 import asyncio
+import os
 from datetime import datetime
 import pytz
 import time
+from storage import create_storage
+from utils.embed_registry import EmbedRegistry
+from utils.leader import LeaderLease, leads
+from utils.log import setup_logging
+from utils.metrics import instrument_discord_http, start_metrics_server
+from utils.watchdog import LoopWatchdog
+
+log = logging.getLogger(__name__)
 
 # Initialize the bot
 intents = discord.Intents.default()
@@ -15,118 +23,85 @@ intents.guilds = True
 intents.members = True
 intents.invites = True
 intents.presences = True
-bot = commands.Bot(command_prefix="!", intents=intents)
 
-# Function to create a MySQL connection
-def connect_to_database():
-    try:
-        conn = mysql.connector.connect(
-            host='-',         # Replace with your server IP or hostname
-            user='-',         # Replace with your MySQL username
-            password='-',     # Replace with your MySQL password
-            database='-'      # Replace with your MySQL database name
-        )
-        print("Connected to the database successfully.")
-        return conn
-    except mysql.connector.Error as err:
-        print(f"Error: Could not connect to the database. {err}")
-        return None
-
-# Set up MySQL database connection
-conn = connect_to_database()
-if conn is None:
-    print("Failed to establish a database connection. Exiting.")
-    exit(1)
-
-cursor = conn.cursor()
-
-# Create tables if they do not exist
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS embeds (
-    id VARCHAR(255) PRIMARY KEY,
-    message_id BIGINT,
-    channel_id BIGINT
-)
-''')
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS invites (
-    user_id VARCHAR(255) PRIMARY KEY,
-    last_invite DATETIME,
-    invite_url TEXT,
-    inviter VARCHAR(255),
-    invitee TEXT
-)
-''')
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS events (
-    event_id INT PRIMARY KEY AUTO_INCREMENT,
-    name VARCHAR(255) NOT NULL,
-    crew_name VARCHAR(255) NOT NULL,
-    flyer_url TEXT,
-    crew_logo_url TEXT,
-    location VARCHAR(255),
-    event_date DATE,
-    start_time DATETIME,
-    end_time DATETIME,
-    age_requirement VARCHAR(10),
-    cover_fee VARCHAR(255),
-    reminder_time DATETIME,
-    contact_info TEXT,
-    event_type VARCHAR(255),
-    message_id BIGINT,
-    channel_id BIGINT,
-    reminder_sent BOOLEAN DEFAULT FALSE
+# Sharding: by default Discord picks the shard count and this process runs every shard.
+# To split the bot across processes, give each one the same GALAXIAN_SHARD_COUNT and its
+# own GALAXIAN_SHARD_IDS (e.g. "0,1" and "2,3"); background work follows the shards.
+SHARD_COUNT = int(os.environ["GALAXIAN_SHARD_COUNT"]) if os.environ.get("GALAXIAN_SHARD_COUNT") else None
+SHARD_IDS = [int(i) for i in os.environ["GALAXIAN_SHARD_IDS"].split(",")] if os.environ.get("GALAXIAN_SHARD_IDS") else None
+
+bot = commands.AutoShardedBot(command_prefix="!", intents=intents, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
+
+# Storage backend: 'mysql' (shared async pool) or 'sqlite' (embedded, single node)
+STORAGE_BACKEND = 'mysql'
+
+# MySQL connection settings for the shared async pool
+DB_CONFIG = dict(
+    host='-',         # Replace with your server IP or hostname
+    user='-',         # Replace with your MySQL username
+    password='-',     # Replace with your MySQL password
+    db='-',           # Replace with your MySQL database name
+    maxsize=10,       # Upper bound on concurrent queries across all cogs
 )
-''')
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS rsvp_users (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    event_id INT NOT NULL,
-    user_id BIGINT NOT NULL,
-    rsvp_time DATETIME NOT NULL,
-    FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE
+
+# SQLite settings (WAL mode, one file next to the bot)
+SQLITE_CONFIG = dict(
+    path='galaxian.db',
 )
-''')
 
-conn.commit()
+# Local Prometheus endpoint (http://127.0.0.1:9108/metrics)
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = 9108
 
-# Attach connection to bot
-bot.conn = conn
-bot.cursor = cursor
+# Logging: DEBUG includes per-reaction and per-tick messages; JSON for log shippers
+LOG_LEVEL = 'INFO'
+LOG_JSON = False
+
+# Admin/testing channel for startup notices and event-loop stall reports
+ADMIN_CHANNEL_ID = 123456789012345678  # Replace with your testing channel ID
+
+# Redundant instances elect a leader to run reminders, cleanup and the invite board.
+# A crashed leader is replaced within LEADER_LEASE_TTL + LEADER_RENEW_INTERVAL seconds;
+# one that shuts down cleanly hands over within LEADER_RENEW_INTERVAL.
+LEADER_LEASE_TTL = 15
+LEADER_RENEW_INTERVAL = 5
+
+# Stalls longer than this are traced to the blocking coroutine and reported
+WATCHDOG_THRESHOLD = 0.5
+
+class NotLeader(commands.CheckFailure):
+    """A command reached a follower; the leader instance answers it."""
+
+
+@bot.check
+async def leader_only(ctx):
+    # Every redundant instance receives each command; only one may reply and act on it
+    if not leads(bot):
+        raise NotLeader()
+    return True
+
+
+@bot.event
+async def on_command_error(ctx, error):
+    if isinstance(error, NotLeader):
+        return
+    await commands.AutoShardedBot.on_command_error(bot, ctx, error)
 
-# Connection monitoring task
-@tasks.loop(minutes=1)
-async def monitor_database_connection():
-    """Ensure the MySQL connection remains active."""
-    global conn, cursor
-    try:
-        conn.ping(reconnect=True, attempts=3, delay=2)
-        print("Database connection is active.")
-    except Error as err:
-        print(f"Database connection lost: {err}. Reconnecting...")
-        conn = connect_to_database()
-        if conn:
-            cursor = conn.cursor()
-            bot.conn = conn
-            bot.cursor = cursor
-            print("Database reconnected successfully.")
 
 # Load extensions (cogs)
 async def load_cogs():
-    cogs = ["cogs.embed_management", "cogs.event_management", "cogs.invite_system", "cogs.rsvp_system"]
+    cogs = ["cogs.embed_management", "cogs.event_management", "cogs.invite_system", "cogs.rsvp_system", "cogs.health"]
     for cog in cogs:
         try:
             await bot.load_extension(cog)
-            print(f"Loaded cog: {cog}")
+            log.info(f"Loaded cog: {cog}")
         except Exception as e:
-            print(f"Failed to load cog {cog}: {e}")
+            log.error(f"Failed to load cog {cog}: {e}")
 
 @bot.event
 async def on_ready():
-    print(f"{bot.user.name} has connected to Discord and is ready.")
+    log.info(f"{bot.user.name} has connected to Discord and is ready.")
+    log.info(f"Running shards {sorted(bot.shards)} of {bot.shard_count}.")
 
     # Log time information
     system_time = time.ctime()
@@ -135,40 +110,84 @@ async def on_ready():
     pst = pytz.timezone('America/Los_Angeles')
     pst_now = utc_now.astimezone(pst)
 
-    print(f"System time: {system_time} (Time Zone: {tz_name})")
-    print(f"Current UTC time: {utc_now}")
-    print(f"Current PST time: {pst_now}")
+    log.info(f"System time: {system_time} (Time Zone: {tz_name})")
+    log.info(f"Current UTC time: {utc_now}")
+    log.info(f"Current PST time: {pst_now}")
 
     # Optional: Send to a Discord channel
-    channel_id = 123456789012345678  # Replace with your testing channel ID
-    channel = bot.get_channel(channel_id)
+    channel = bot.get_channel(ADMIN_CHANNEL_ID)
     if channel:
         await channel.send(
             f"**Bot Startup Time**:\n"
             f"System time: {system_time} (Time Zone: {tz_name})\n"
             f"Current UTC time: {utc_now.strftime('%Y-%m-%d %H:%M:%S')} UTC\n"
-            f"Current PST time: {pst_now.strftime('%Y-%m-%d %I:%M %p')} PST"
+            f"Current PST time: {pst_now.strftime('%Y-%m-%d %I:%M %p')} PST\n"
+            f"Shards: {', '.join(map(str, sorted(bot.shards)))} of {bot.shard_count}"
         )
 
-    # Start the database monitoring task
-    monitor_database_connection.start()
-
     # Load cogs dynamically
     await load_cogs()
 
-    # Check if RSVPCog is loaded and run initialization tasks
+    # Check if RSVPCog is loaded and run initialization tasks; followers load events when promoted
     rsvp_cog = bot.get_cog('RSVPCog')
-    if rsvp_cog:
+    if rsvp_cog and leads(bot):
         await rsvp_cog.load_rsvp_events()
         await rsvp_cog.sync_reactions_on_startup()
 
-    print("All systems are go!")
+    log.info("All systems are go!")
 
-@bot.event
-async def on_disconnect():
-    conn.close()
-    print("Database connection closed.")
+async def report_stall(stall):
+    """Post an event-loop stall report from the watchdog to the admin channel."""
+    channel = bot.get_channel(ADMIN_CHANNEL_ID)
+    if channel:
+        await channel.send(
+            f"⚠️ **Event loop stalled for {stall['seconds']:.2f}s**\n"
+            f"Running: `{stall['task']}`\n"
+            f"At: `{stall['culprit']}`\n"
+            f"```{stall['stack'][-1500:]}```"
+        )
+
+async def main():
+    # Open the storage backend and attach it to the bot; cogs use its repositories
+    bot.storage = create_storage(STORAGE_BACKEND, **(DB_CONFIG if STORAGE_BACKEND == 'mysql' else SQLITE_CONFIG))
+    if not await bot.storage.connect():
+        log.error("Failed to establish a database connection. Exiting.")
+        return
+    # Bring the schema up to date and make sure hot queries are indexed
+    await bot.storage.migrate()
+    await bot.storage.check_query_plans()
+
+    # Expose DB, Discord API and task loop metrics
+    instrument_discord_http(bot.http)
+    metrics_server = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+
+    # Load pinned embed locations once; cogs read and update them in memory
+    bot.embeds = EmbedRegistry(bot.storage.embeds)
+    await bot.embeds.load()
+
+    # Instances running the same shards share one lease; the first renewal decides which starts as leader
+    lease_name = "background" if SHARD_IDS is None else f"background:{SHARD_COUNT}:{','.join(map(str, SHARD_IDS))}"
+    bot.leader = LeaderLease(bot.storage.leases, lease_name, ttl=LEADER_LEASE_TTL, renew_interval=LEADER_RENEW_INTERVAL)
+    await bot.leader.renew()
+    bot.leader.start()
+
+    # Watch for blocking calls that delay gateway heartbeats
+    watchdog = LoopWatchdog(threshold=WATCHDOG_THRESHOLD, on_stall=report_stall)
+    watchdog.start()
+
+    try:
+        async with bot:
+            await bot.start("-")  # Replace with your bot token
+    finally:
+        watchdog.stop()
+        metrics_server.close()
+        await bot.leader.stop()
+        await bot.storage.close()
 
 # Running the bot
 if __name__ == "__main__":
-    bot.run("-")  # Replace with your bot token
+    log_listener = setup_logging(LOG_LEVEL, LOG_JSON)
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()
@@ -0,0 +1,16 @@
+"""Storage backends behind a common set of repositories (events, rsvps, invites, embeds)."""
+from storage.base import Storage
+
+
+def create_storage(backend, **config):
+    """Build the Storage for `backend` ('mysql' or 'sqlite'); only that backend's driver is imported."""
+    if backend == "mysql":
+        from storage.mysql import MySQLStorage
+        return MySQLStorage(**config)
+    if backend == "sqlite":
+        from storage.sqlite import SQLiteStorage
+        return SQLiteStorage(**config)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+__all__ = ["Storage", "create_storage"]
@@ -0,0 +1,409 @@
+"""Repositories shared by every storage backend.
+
+Statements are written once with %s placeholders; each backend's driver
+maps them to its own paramstyle. The few constructs that differ between
+MySQL and SQLite (insert-or-ignore and upsert) come from the backend's
+Dialect, and each backend's driver subclasses BaseDatabase.
+"""
+import abc
+import logging
+import time
+
+from utils.metrics import DB_QUERY_ERRORS, DB_QUERY_SECONDS, query_labels
+
+log = logging.getLogger(__name__)
+
+
+class BaseDatabase(abc.ABC):
+    """Statement dispatch shared by the database drivers.
+
+    Every statement is timed in the metrics registry and retried once if the
+    driver reports a retryable error; subclasses only run it on a connection.
+    """
+
+    def __init__(self):
+        self.last_success = 0.0  # time.monotonic() of the last statement that reached the server
+
+    @property
+    @abc.abstractmethod
+    def connected(self):
+        """Whether connect() succeeded and close() has not been called."""
+
+    @abc.abstractmethod
+    async def _attempt(self, query, args, fetch, dictionary, many):
+        """Run one statement once and return self._result() for its cursor."""
+
+    @abc.abstractmethod
+    async def _ping(self, timeout):
+        """Round-trip to the server, raising if it cannot be reached."""
+
+    def retryable(self, err, fetch):
+        """Whether a statement that raised err is safe to run again."""
+        return False
+
+    def convert(self, row, dictionary):
+        """A fetched row in the shape callers expect (a dict when dictionary=True, else a tuple)."""
+        return row
+
+    async def _run(self, query, args=None, fetch=None, dictionary=False, many=False):
+        """Run one statement, recording its latency and errors in the metrics registry."""
+        labels = query_labels(query)
+        with DB_QUERY_SECONDS.time(*labels):
+            try:
+                return await self._execute(query, args, fetch, dictionary, many)
+            except Exception:
+                DB_QUERY_ERRORS.inc(*labels)
+                raise
+
+    async def _execute(self, query, args, fetch, dictionary, many):
+        for attempt in range(2):
+            try:
+                return await self._attempt(query, args, fetch, dictionary, many)
+            except Exception as err:
+                if attempt == 0 and self.retryable(err, fetch):
+                    continue
+                raise
+
+    async def _result(self, cursor, fetch, dictionary=False):
+        self.last_success = time.monotonic()
+        if fetch == "one":
+            row = await cursor.fetchone()
+            return self.convert(row, dictionary) if row is not None else None
+        if fetch == "all":
+            return [self.convert(row, dictionary) for row in await cursor.fetchall()]
+        if fetch == "lastrowid":
+            return cursor.lastrowid
+        return cursor.rowcount
+
+    async def fetchone(self, query, args=None, dictionary=False):
+        return await self._run(query, args, fetch="one", dictionary=dictionary)
+
+    async def fetchall(self, query, args=None, dictionary=False):
+        return await self._run(query, args, fetch="all", dictionary=dictionary)
+
+    async def execute(self, query, args=None):
+        """Run a write statement and return the number of affected rows."""
+        return await self._run(query, args)
+
+    async def executemany(self, query, args):
+        """Run a write statement for every parameter tuple in args."""
+        if not args:
+            return 0
+        return await self._run(query, args, many=True)
+
+    async def insert(self, query, args=None):
+        """Run an INSERT and return the generated id."""
+        return await self._run(query, args, fetch="lastrowid")
+
+    async def ping(self, timeout=5):
+        """Health check the connection without ever blocking the event loop."""
+        if not self.connected:
+            return False
+        try:
+            await self._ping(timeout)
+        except Exception as err:
+            log.warning(f"[Database] Ping failed: {err}")
+            return False
+        self.last_success = time.monotonic()
+        return True
+
+
+class Dialect(abc.ABC):
+    """Builds the statements whose syntax differs between backends."""
+
+    @abc.abstractmethod
+    def insert_ignore(self, table, columns):
+        """INSERT that skips rows violating a unique key."""
+
+    @abc.abstractmethod
+    def upsert(self, table, columns, key):
+        """INSERT that updates the other columns when `key` already exists."""
+
+    @abc.abstractmethod
+    def shard_of(self, column, shard_count):
+        """Expression for the shard owning the guild id in `column` (a NULL guild belongs to shard 0)."""
+
+    @staticmethod
+    def placeholders(count):
+        return ", ".join(["%s"] * count)
+
+
+class Repository:
+    def __init__(self, db, dialect):
+        self.db = db
+        self.dialect = dialect
+
+
+class EventRepository(Repository):
+    COLUMNS = (
+        "name", "crew_name", "flyer_url", "crew_logo_url", "location", "event_date", "start_time", "end_time",
+        "age_requirement", "cover_fee", "contact_info", "event_type", "reminder_time", "message_id", "channel_id",
+        "guild_id",
+    )
+    PENDING_SQL = "SELECT * FROM events WHERE event_id > %s AND reminder_sent = false ORDER BY event_id"
+    UPCOMING_SQL = (
+        "SELECT message_id, channel_id, event_id, guild_id FROM events WHERE reminder_sent = false AND event_date >= %s"
+    )
+    EXPIRED_SQL = (
+        "SELECT event_id, message_id, channel_id, guild_id, name FROM events WHERE cleaned_up = false AND end_time <= %s"
+    )
+
+    async def create(self, **values):
+        """Insert an event row and return its event_id."""
+        unknown = set(values) - set(self.COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown event columns: {', '.join(sorted(unknown))}")
+        columns = ", ".join(values)
+        return await self.db.insert(
+            f"INSERT INTO events ({columns}) VALUES ({self.dialect.placeholders(len(values))})", tuple(values.values())
+        )
+
+    async def max_id(self):
+        row = await self.db.fetchone("SELECT COALESCE(MAX(event_id), 0) FROM events")
+        return row[0] if row else 0
+
+    async def pending(self, after_id=0):
+        """Events whose reminder has not been sent, oldest first, optionally only those newer than after_id."""
+        return await self.db.fetchall(self.PENDING_SQL, (after_id,), dictionary=True)
+
+    async def upcoming_messages(self, today):
+        """message_id, channel_id, event_id and guild_id of every event from `today` on that still has a reminder pending."""
+        return await self.db.fetchall(self.UPCOMING_SQL, (today,), dictionary=True)
+
+    async def expired(self, now):
+        """Events that ended by `now` and whose flyer has not been cleaned up yet."""
+        return await self.db.fetchall(self.EXPIRED_SQL, (now,), dictionary=True)
+
+    async def set_guilds(self, guild_ids):
+        """Record the guild of events saved before guild_id was tracked, from {event_id: guild_id}."""
+        return await self.db.executemany(
+            "UPDATE events SET guild_id = %s WHERE event_id = %s",
+            [(guild_id, event_id) for event_id, guild_id in guild_ids.items()],
+        )
+
+    async def mark_reminder_sent(self, event_id):
+        await self.db.execute("UPDATE events SET reminder_sent = true WHERE event_id = %s", (event_id,))
+
+    async def mark_cleaned_up(self, event_ids):
+        event_ids = list(event_ids)
+        if not event_ids:
+            return 0
+        return await self.db.execute(
+            f"UPDATE events SET cleaned_up = true, reminder_sent = true "
+            f"WHERE event_id IN ({self.dialect.placeholders(len(event_ids))})",
+            event_ids,
+        )
+
+
+class RSVPRepository(Repository):
+    USER_IDS_SQL = "SELECT user_id FROM rsvp_users WHERE event_id = %s"
+    FOR_EVENTS_SQL = "SELECT event_id, user_id FROM rsvp_users WHERE event_id IN ({})"
+
+    def __init__(self, db, dialect):
+        super().__init__(db, dialect)
+        self.insert_sql = dialect.insert_ignore("rsvp_users", ("event_id", "user_id", "rsvp_time"))
+
+    async def user_ids(self, event_id):
+        rows = await self.db.fetchall(self.USER_IDS_SQL, (event_id,))
+        return [row[0] for row in rows]
+
+    async def for_events(self, event_ids):
+        """(event_id, user_id) pairs for several events in one query."""
+        event_ids = list(event_ids)
+        if not event_ids:
+            return []
+        return await self.db.fetchall(self.FOR_EVENTS_SQL.format(self.dialect.placeholders(len(event_ids))), event_ids)
+
+    async def add_many(self, rows):
+        """Insert (event_id, user_id, rsvp_time) rows, skipping RSVPs that already exist."""
+        return await self.db.executemany(self.insert_sql, rows)
+
+    async def remove(self, event_id, user_ids):
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        return await self.db.execute(
+            f"DELETE FROM rsvp_users WHERE event_id = %s AND user_id IN ({self.dialect.placeholders(len(user_ids))})",
+            (event_id, *user_ids),
+        )
+
+
+class InviteRepository(Repository):
+    LAST_INVITE_SQL = "SELECT last_invite FROM invites WHERE user_id = %s"
+    LAST_INVITER_SQL = "SELECT inviter FROM invites ORDER BY last_invite DESC LIMIT 1"
+
+    def __init__(self, db, dialect):
+        super().__init__(db, dialect)
+        self.upsert_sql = dialect.upsert("invites", ("user_id", "last_invite", "invite_url", "inviter"), "user_id")
+
+    async def last_invite(self, user_id):
+        """When user_id last generated an invite, or None."""
+        row = await self.db.fetchone(self.LAST_INVITE_SQL, (user_id,))
+        return row[0] if row else None
+
+    async def record(self, user_id, last_invite, invite_url, inviter):
+        await self.db.execute(self.upsert_sql, (user_id, last_invite, invite_url, inviter))
+
+    async def count(self):
+        row = await self.db.fetchone("SELECT COUNT(*) FROM invites")
+        return row[0] if row else 0
+
+    async def last_inviter(self):
+        row = await self.db.fetchone(self.LAST_INVITER_SQL)
+        return row[0] if row else None
+
+
+class EmbedRepository(Repository):
+    def __init__(self, db, dialect):
+        super().__init__(db, dialect)
+        self.upsert_sql = dialect.upsert("embeds", ("id", "message_id", "channel_id"), "id")
+
+    async def all(self):
+        """(id, message_id, channel_id) for every pinned embed."""
+        return await self.db.fetchall("SELECT id, message_id, channel_id FROM embeds")
+
+    async def save(self, embed_id, message_id, channel_id):
+        await self.db.execute(self.upsert_sql, (embed_id, message_id, channel_id))
+
+
+class OutboxRepository(Repository):
+    COLUMNS = ("event_id", "guild_id", "user_id", "kind", "content", "available_at", "created_at")
+    DUE_SQL = (
+        "SELECT id FROM outbox WHERE status = 'pending' AND available_at <= %s "
+        "AND (claimed_until IS NULL OR claimed_until < %s){shards} ORDER BY available_at, id LIMIT %s"
+    )
+
+    def __init__(self, db, dialect):
+        super().__init__(db, dialect)
+        self.insert_sql = dialect.insert_ignore("outbox", self.COLUMNS)
+
+    async def enqueue(self, rows):
+        """Queue (event_id, guild_id, user_id, kind, content, available_at, created_at) deliveries; returns how many were new.
+
+        (event_id, user_id, kind) is unique, so queueing the same delivery again is a no-op.
+        """
+        return await self.db.executemany(self.insert_sql, rows)
+
+    async def claim(self, claimer, now, claimed_until, limit, shards=None):
+        """Claim up to `limit` due deliveries for `claimer` (unique per claim) and return them as dicts.
+
+        With `shards` as (shard_count, shard_ids), only deliveries for guilds on those shards are claimed.
+        """
+        shard_filter = ""
+        if shards is not None and shards[0] > 1:
+            shard_count, shard_ids = shards
+            owned = ", ".join(str(int(shard_id)) for shard_id in sorted(shard_ids))
+            shard_filter = f" AND {self.dialect.shard_of('guild_id', int(shard_count))} IN ({owned})"
+        rows = await self.db.fetchall(self.DUE_SQL.format(shards=shard_filter), (now, now, limit))
+        ids = [row[0] for row in rows]
+        if not ids:
+            return []
+        # Re-check the claim condition so a concurrent worker that claimed a row first keeps it
+        placeholders = self.dialect.placeholders(len(ids))
+        await self.db.execute(f'''
+            UPDATE outbox SET claimed_by = %s, claimed_until = %s
+            WHERE id IN ({placeholders}) AND status = 'pending' AND (claimed_until IS NULL OR claimed_until < %s)
+        ''', (claimer, claimed_until, *ids, now))
+        return await self.db.fetchall(
+            f"SELECT id, event_id, user_id, content, attempts FROM outbox WHERE claimed_by = %s AND id IN ({placeholders})",
+            (claimer, *ids), dictionary=True,
+        )
+
+    async def complete(self, delivery_id, status, now):
+        """Record the final outcome of one delivery ('sent', 'forbidden', 'failed' or 'missing')."""
+        await self.db.execute('''
+            UPDATE outbox SET status = %s, attempts = attempts + 1, completed_at = %s, claimed_by = NULL, claimed_until = NULL
+            WHERE id = %s
+        ''', (status, now, delivery_id))
+
+    async def retry(self, delivery_id, available_at):
+        """Release a failed delivery to be tried again at `available_at`."""
+        await self.db.execute('''
+            UPDATE outbox SET attempts = attempts + 1, available_at = %s, claimed_by = NULL, claimed_until = NULL
+            WHERE id = %s
+        ''', (available_at, delivery_id))
+
+    async def extend(self, delivery_ids, claimed_until):
+        """Keep claimed deliveries that are still being sent from expiring before `claimed_until`."""
+        delivery_ids = list(delivery_ids)
+        if not delivery_ids:
+            return 0
+        return await self.db.execute(
+            f"UPDATE outbox SET claimed_until = %s "
+            f"WHERE status = 'pending' AND id IN ({self.dialect.placeholders(len(delivery_ids))})",
+            (claimed_until, *delivery_ids),
+        )
+
+    async def release(self, delivery_ids):
+        """Hand unfinished deliveries back without waiting for their claim to expire."""
+        delivery_ids = list(delivery_ids)
+        if not delivery_ids:
+            return 0
+        return await self.db.execute(
+            f"UPDATE outbox SET claimed_by = NULL, claimed_until = NULL "
+            f"WHERE status = 'pending' AND id IN ({self.dialect.placeholders(len(delivery_ids))})",
+            delivery_ids,
+        )
+
+    async def purge(self, before):
+        """Delete finished deliveries completed before `before`."""
+        return await self.db.execute(
+            "DELETE FROM outbox WHERE status <> 'pending' AND completed_at < %s", (before,)
+        )
+
+
+class LeaseRepository(Repository):
+    def __init__(self, db, dialect):
+        super().__init__(db, dialect)
+        self.insert_sql = dialect.insert_ignore("leases", ("name", "holder", "expires_at"))
+
+    async def acquire(self, name, holder, now, ttl):
+        """Take or renew lease `name` for `ttl` if it is free, expired or already held; True if holder has it now."""
+        expires_at = now + ttl
+        await self.db.execute(self.insert_sql, (name, holder, expires_at))
+        await self.db.execute('''
+            UPDATE leases SET holder = %s, expires_at = %s
+            WHERE name = %s AND (holder = %s OR expires_at < %s)
+        ''', (holder, expires_at, name, holder, now))
+        # Read the winner back instead of trusting affected-row counts, which differ between drivers
+        row = await self.db.fetchone("SELECT holder FROM leases WHERE name = %s", (name,))
+        return bool(row) and row[0] == holder
+
+    async def release(self, name, holder):
+        """Give the lease up so a standby can take it over without waiting for it to expire."""
+        await self.db.execute("DELETE FROM leases WHERE name = %s AND holder = %s", (name, holder))
+
+
+class Storage(abc.ABC):
+    """One backend connection and the repositories the cogs use, shared through bot.storage."""
+
+    def __init__(self, db, dialect):
+        self.db = db
+        self.events = EventRepository(db, dialect)
+        self.rsvps = RSVPRepository(db, dialect)
+        self.invites = InviteRepository(db, dialect)
+        self.embeds = EmbedRepository(db, dialect)
+        self.leases = LeaseRepository(db, dialect)
+        self.outbox = OutboxRepository(db, dialect)
+
+    @property
+    def last_success(self):
+        """time.monotonic() of the last statement that reached the backend."""
+        return self.db.last_success
+
+    async def connect(self):
+        return await self.db.connect()
+
+    async def close(self):
+        await self.db.close()
+
+    async def ping(self):
+        return await self.db.ping()
+
+    @abc.abstractmethod
+    async def migrate(self):
+        """Bring the schema up to the latest version."""
+
+    async def check_query_plans(self):
+        """Warn about hot queries that cannot use their index; returns the number of problems."""
+        return 0
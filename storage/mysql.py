@@ -0,0 +1,34 @@
+from storage.base import Dialect, Storage
+from utils.database import Database
+from utils.migrations import check_query_plans, run_migrations
+
+
+class MySQLDialect(Dialect):
+    def insert_ignore(self, table, columns):
+        return f"INSERT IGNORE INTO {table} ({', '.join(columns)}) VALUES ({self.placeholders(len(columns))})"
+
+    def upsert(self, table, columns, key):
+        updates = ", ".join(f"{column} = VALUES({column})" for column in columns if column != key)
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({self.placeholders(len(columns))}) "
+            f"ON DUPLICATE KEY UPDATE {updates}"
+        )
+
+    def shard_of(self, column, shard_count):
+        # MOD() rather than %, which the driver would read as a placeholder
+        return f"MOD(COALESCE({column}, 0) >> 22, {int(shard_count)})"
+
+
+class MySQLStorage(Storage):
+    """Repositories over the shared aiomysql pool."""
+
+    def __init__(self, **config):
+        super().__init__(Database(**config), MySQLDialect())
+
+    async def migrate(self):
+        # Redundant instances start together; only one may apply migrations at a time
+        async with self.db.named_lock("galaxian_migrations"):
+            return await run_migrations(self.db)
+
+    async def check_query_plans(self):
+        return await check_query_plans(self.db)
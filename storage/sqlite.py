@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import sqlite3
+from datetime import date, datetime, timezone
+
+import aiosqlite
+
+from storage.base import BaseDatabase, Dialect, RSVPRepository, Storage
+from utils.migrations import HOT_QUERIES, mark_ended_cleaned_up, run_migrations
+
+log = logging.getLogger(__name__)
+
+
+def _adapt_datetime(value):
+    # Store UTC wall-clock time without an offset, like a MySQL DATETIME column
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(" ")
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("DATETIME", lambda raw: datetime.fromisoformat(raw.decode()))
+sqlite3.register_converter("DATE", lambda raw: date.fromisoformat(raw.decode()))
+sqlite3.register_converter("BOOLEAN", int)
+
+
+class SQLiteDatabase(BaseDatabase):
+    """Async SQLite connection in WAL mode, the embedded counterpart of utils.database.Database.
+
+    aiosqlite runs every statement on one background thread, so queries
+    never block the event loop; WAL lets readers proceed while a write
+    is being committed. The connection autocommits single statements;
+    executemany runs its whole batch in one transaction.
+    """
+
+    def __init__(self, path, busy_timeout=5000):
+        super().__init__()
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.conn = None
+        self.statements = {}  # %s-style statement -> ?-style statement
+        self.lock = asyncio.Lock()  # One connection is shared by every coroutine; keeps a batch's transaction to itself
+
+    async def connect(self):
+        try:
+            self.conn = await aiosqlite.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES, isolation_level=None)
+            self.conn.row_factory = sqlite3.Row
+            await self.conn.execute("PRAGMA journal_mode = WAL")
+            await self.conn.execute("PRAGMA synchronous = NORMAL")  # Durable across app crashes, fsync only at checkpoints
+            await self.conn.execute("PRAGMA foreign_keys = ON")
+            await self.conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+            log.info(f"Opened SQLite database {self.path} (WAL).")
+            return True
+        except Exception as err:
+            log.error(f"Error: Could not open the SQLite database {self.path}. {err}")
+            return False
+
+    async def close(self):
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
+            log.info("SQLite database closed.")
+
+    def _sql(self, query):
+        sql = self.statements.get(query)
+        if sql is None:
+            sql = self.statements[query] = query.replace("%s", "?")
+        return sql
+
+    @property
+    def connected(self):
+        return self.conn is not None
+
+    def convert(self, row, dictionary):
+        return dict(row) if dictionary else tuple(row)
+
+    async def _attempt(self, query, args, fetch, dictionary, many):
+        sql = self._sql(query)
+        async with self.lock:
+            if not many:
+                async with await self.conn.execute(sql, args or ()) as cursor:
+                    return await self._result(cursor, fetch, dictionary)
+            # In autocommit mode every row would be its own transaction
+            await self.conn.execute("BEGIN")
+            try:
+                async with await self.conn.executemany(sql, args) as cursor:
+                    result = await self._result(cursor, fetch, dictionary)
+                await self.conn.execute("COMMIT")
+            except BaseException:
+                await self.conn.execute("ROLLBACK")
+                raise
+            return result
+
+    async def _ping(self, timeout):
+        async with self.lock:
+            await self.conn.execute("SELECT 1")
+
+
+class SQLiteDialect(Dialect):
+    def insert_ignore(self, table, columns):
+        return f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({self.placeholders(len(columns))})"
+
+    def upsert(self, table, columns, key):
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != key)
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({self.placeholders(len(columns))}) "
+            f"ON CONFLICT ({key}) DO UPDATE SET {updates}"
+        )
+
+    def shard_of(self, column, shard_count):
+        return f"((COALESCE({column}, 0) >> 22) % {int(shard_count)})"
+
+
+def add_column(table, column, definition):
+    """Step that adds a column unless it already exists (SQLite has no ADD COLUMN IF NOT EXISTS)."""
+    async def step(db):
+        columns = await db.fetchall(f"PRAGMA table_info({table})")
+        if column not in {row[1] for row in columns}:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return step
+
+
+class SQLiteRSVPRepository(RSVPRepository):
+    """INSERT OR IGNORE does not skip foreign key violations in SQLite, so one RSVP for a
+    deleted event would fail the whole write-behind batch; such rows are filtered out
+    by the statement itself instead."""
+
+    def __init__(self, db, dialect):
+        super().__init__(db, dialect)
+        self.insert_sql = (
+            "INSERT OR IGNORE INTO rsvp_users (event_id, user_id, rsvp_time) "
+            "SELECT %s, %s, %s WHERE EXISTS (SELECT 1 FROM events WHERE event_id = %s)"
+        )
+
+    async def add_many(self, rows):
+        return await self.db.executemany(self.insert_sql, [(event_id, *rest, event_id) for event_id, *rest in rows])
+
+
+# Same versions as utils.migrations.MIGRATIONS, in SQLite syntax.
+MIGRATIONS = [
+    (1, "Initial schema", [
+        '''
+        CREATE TABLE IF NOT EXISTS embeds (
+            id TEXT PRIMARY KEY,
+            message_id INTEGER,
+            channel_id INTEGER
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS invites (
+            user_id TEXT PRIMARY KEY,
+            last_invite DATETIME,
+            invite_url TEXT,
+            inviter TEXT,
+            invitee TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS events (
+            event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            crew_name TEXT NOT NULL,
+            flyer_url TEXT,
+            crew_logo_url TEXT,
+            location TEXT,
+            event_date DATE,
+            start_time DATETIME,
+            end_time DATETIME,
+            age_requirement TEXT,
+            cover_fee TEXT,
+            reminder_time DATETIME,
+            contact_info TEXT,
+            event_type TEXT,
+            message_id INTEGER,
+            channel_id INTEGER,
+            reminder_sent BOOLEAN DEFAULT FALSE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS rsvp_users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL REFERENCES events(event_id) ON DELETE CASCADE,
+            user_id INTEGER NOT NULL,
+            rsvp_time DATETIME NOT NULL
+        )
+        ''',
+    ]),
+    (2, "One RSVP per user and event", [
+        "DELETE FROM rsvp_users WHERE id NOT IN (SELECT MIN(id) FROM rsvp_users GROUP BY event_id, user_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_rsvp_event_user ON rsvp_users (event_id, user_id)",
+    ]),
+    (3, "Indexes for hot-path queries", [
+        "CREATE INDEX IF NOT EXISTS idx_events_message_id ON events (message_id)",
+        "CREATE INDEX IF NOT EXISTS idx_events_reminder_date ON events (reminder_sent, event_date)",
+        "CREATE INDEX IF NOT EXISTS idx_events_end_time ON events (end_time)",
+        "CREATE INDEX IF NOT EXISTS idx_invites_last_invite ON invites (last_invite)",
+    ]),
+    (4, "Track which ended events have had their flyer cleaned up", [
+        add_column("events", "cleaned_up", "BOOLEAN NOT NULL DEFAULT FALSE"),
+        mark_ended_cleaned_up,
+        "CREATE INDEX IF NOT EXISTS idx_events_cleanup ON events (cleaned_up, end_time)",
+    ]),
+    (5, "Record each event's guild so background work can be partitioned by shard", [
+        add_column("events", "guild_id", "INTEGER"),
+    ]),
+    (6, "Leader lease for background tasks shared by redundant instances", [
+        '''
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires_at DATETIME NOT NULL
+        )
+        ''',
+    ]),
+    (7, "Durable outbox for reminder DMs", [
+        '''
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            content TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            available_at DATETIME NOT NULL,
+            claimed_by TEXT,
+            claimed_until DATETIME,
+            created_at DATETIME NOT NULL,
+            completed_at DATETIME
+        )
+        ''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_outbox_delivery ON outbox (event_id, user_id, kind)",
+        "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, available_at)",
+        "CREATE INDEX IF NOT EXISTS idx_outbox_claimed_by ON outbox (claimed_by)",
+    ]),
+    (8, "Index the pending-event scans; drop the unused flyer message index", [
+        "CREATE INDEX IF NOT EXISTS idx_events_pending ON events (reminder_sent, event_id)",
+        "DROP INDEX IF EXISTS idx_events_message_id",
+    ]),
+    (9, "Record the guild of each outbox delivery so workers only claim their own shards", [
+        add_column("outbox", "guild_id", "INTEGER"),
+    ]),
+]
+
+
+async def check_query_plans(db):
+    """EXPLAIN QUERY PLAN the cogs' hot queries and warn about any that do not use the expected index."""
+    problems = 0
+    for name, query, args, expected in HOT_QUERIES:
+        plan = await db.fetchall(f"EXPLAIN QUERY PLAN {query}", args)
+        details = " | ".join(row[-1] for row in plan)
+        if not any(index in details for index in expected):
+            problems += 1
+            log.warning(f"[Query Plans] '{name}' does not use {' or '.join(expected)}; plan: {details}")
+    log.info(f"[Query Plans] Checked {len(HOT_QUERIES)} hot queries, {problems} missing an index.")
+    return problems
+
+
+class SQLiteStorage(Storage):
+    """Repositories over an embedded SQLite database, for single-node deployments and benchmarks."""
+
+    def __init__(self, path="galaxian.db", db=None):
+        dialect = SQLiteDialect()
+        super().__init__(db or SQLiteDatabase(path), dialect)
+        self.rsvps = SQLiteRSVPRepository(self.db, dialect)
+
+    async def migrate(self):
+        return await run_migrations(self.db, MIGRATIONS)
+
+    async def check_query_plans(self):
+        return await check_query_plans(self.db)
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import aiomysql
+
+from storage.base import BaseDatabase
+
+log = logging.getLogger(__name__)
+
+
+# MySQL client errors that mean the pooled connection was dead before the
+# statement reached the server (server gone away / lost connection), so any
+# statement is safe to retry on a fresh connection.
+LOST_CONNECTION_ERRORS = (2006, 2055)
+
+# Lost connection *during* a query: the server may already have applied it,
+# so only reads are retried.
+LOST_DURING_QUERY = 2013
+
+
+class Database(BaseDatabase):
+    """Async MySQL connection pool used by storage.mysql.MySQLStorage."""
+
+    def __init__(self, host, user, password, db, port=3306, minsize=1, maxsize=10, pool_recycle=3600):
+        super().__init__()
+        self.config = dict(host=host, user=user, password=password, db=db, port=port)
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self.pool_recycle = pool_recycle
+        self.pool = None
+
+    async def connect(self):
+        """Create the pool. Returns False if the server cannot be reached."""
+        try:
+            self.pool = await aiomysql.create_pool(
+                minsize=self.minsize,
+                maxsize=self.maxsize,
+                autocommit=True,
+                pool_recycle=self.pool_recycle,
+                **self.config,
+            )
+            log.info(f"Connected to the database successfully (pool size {self.minsize}-{self.maxsize}).")
+            return True
+        except Exception as err:
+            log.error(f"Error: Could not connect to the database. {err}")
+            return False
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+            log.info("Database connection pool closed.")
+
+    @property
+    def connected(self):
+        return self.pool is not None
+
+    def retryable(self, err, fetch):
+        if not isinstance(err, aiomysql.OperationalError):
+            return False
+        code = err.args[0] if err.args else None
+        return code in LOST_CONNECTION_ERRORS or (code == LOST_DURING_QUERY and fetch in ("one", "all"))
+
+    async def _attempt(self, query, args, fetch, dictionary, many):
+        """Check a connection out of the pool, run one statement and return its result."""
+        cursor_class = aiomysql.DictCursor if dictionary else aiomysql.Cursor
+        async with self.pool.acquire() as conn:
+            try:
+                async with conn.cursor(cursor_class) as cursor:
+                    if many:
+                        await cursor.executemany(query, args)
+                    else:
+                        await cursor.execute(query, args)
+                    return await self._result(cursor, fetch)
+            except aiomysql.OperationalError as err:
+                if self.retryable(err, fetch):
+                    # Drop the broken connection; the pool opens a fresh one on the retry.
+                    conn.close()
+                raise
+
+    @asynccontextmanager
+    async def named_lock(self, name, timeout=60):
+        """Hold MySQL lock `name` (GET_LOCK) on one pooled connection for the duration of the block."""
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT GET_LOCK(%s, %s)", (name, timeout))
+                (acquired,) = await cursor.fetchone()
+            if acquired != 1:
+                raise TimeoutError(f"Could not acquire lock '{name}' within {timeout}s")
+            try:
+                yield
+            finally:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+
+    async def _ping(self, timeout):
+        async with self.pool.acquire() as conn:
+            await asyncio.wait_for(conn.ping(reconnect=True), timeout)
@@ -0,0 +1,43 @@
+import logging
+
+log = logging.getLogger(__name__)
+
+class EmbedRegistry:
+    """In-process copy of the embeds table (central, invite_board, ...).
+
+    Loaded once at startup and written through on save, so listeners can
+    match a reaction against every pinned embed with a dictionary lookup.
+    """
+
+    def __init__(self, repository):
+        self.repository = repository  # storage EmbedRepository
+        self.embeds = {}  # embed id -> (message_id, channel_id)
+        self.by_message = {}  # message_id -> embed id
+
+    async def load(self):
+        rows = await self.repository.all()
+        self.embeds.clear()
+        self.by_message.clear()
+        for embed_id, message_id, channel_id in rows:
+            self._set(embed_id, message_id, channel_id)
+        log.info(f"Loaded {len(self.embeds)} embed location(s) from the database.")
+
+    def _set(self, embed_id, message_id, channel_id):
+        previous = self.embeds.get(embed_id)
+        if previous:
+            self.by_message.pop(previous[0], None)
+        self.embeds[embed_id] = (message_id, channel_id)
+        self.by_message[message_id] = embed_id
+
+    def get(self, embed_id):
+        """Return (message_id, channel_id) for an embed, or None if it was never posted."""
+        return self.embeds.get(embed_id)
+
+    def find(self, message_id):
+        """Return the embed id posted as message_id, or None."""
+        return self.by_message.get(message_id)
+
+    async def save(self, embed_id, message_id, channel_id):
+        """Persist an embed location and update the in-memory copy."""
+        await self.repository.save(embed_id, message_id, channel_id)
+        self._set(embed_id, message_id, channel_id)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import random
+import time
+
+import discord
+
+log = logging.getLogger(__name__)
+
+
+# Discord allows roughly 50 requests per second per bot across all routes.
+# Stay under it so reminder bursts never trip the global limit.
+GLOBAL_RATE_LIMIT = 40
+
+
+class TokenBucket:
+    """Async token bucket used to pace requests below Discord's global rate limit."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """Drain the bucket so nobody sends for `seconds` (used after a global 429)."""
+        self.tokens = -seconds * self.rate
+        self.updated = time.monotonic()
+
+
+class FanoutProgress:
+    """Delivery counters for one fan-out job."""
+
+    def __init__(self, key, total):
+        self.key = key
+        self.total = total
+        self.sent = 0
+        self.forbidden = 0
+        self.failed = 0
+        self.missing = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.sent + self.forbidden + self.failed + self.missing
+
+    def record(self, outcome):
+        """Count one delivery outcome ('sent', 'forbidden', 'failed' or 'missing')."""
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        self.total = max(self.total, self.done)  # Deliveries recovered after a restart were never counted in total
+        if self.done == self.total:
+            self.finished_at = time.monotonic()
+
+    def set_total(self, total):
+        """Settle the expected number of deliveries once it is known."""
+        self.total = max(total, self.done)
+        if self.done == self.total:
+            self.finished_at = self.finished_at or time.monotonic()
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def __str__(self):
+        return (
+            f"{self.done}/{self.total} processed in {self.elapsed:.1f}s "
+            f"(sent {self.sent}, DMs closed {self.forbidden}, failed {self.failed}, unknown users {self.missing})"
+        )
+
+
+class DMFanout:
+    """Send DMs to many users with global pacing and retries, tracking progress per job.
+
+    discord.py already serialises requests per route bucket and retries
+    ordinary 429s; this layer holds the concurrency bound its callers
+    share, paces every DM under the global limit and retries transient
+    failures (5xx, rate limits longer than discord.py will wait for) with
+    jittered exponential backoff.
+    """
+
+    def __init__(self, concurrency=10, rate=GLOBAL_RATE_LIMIT, max_retries=3, base_backoff=1.0, history=50):
+        self.concurrency = concurrency
+        self.history = history
+        self.bucket = TokenBucket(rate)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.progress = {}  # key -> FanoutProgress for running and recently finished jobs
+
+    def track(self, key, total=0):
+        """Start fresh progress counters for job `key`, keeping only the most recent `history` jobs."""
+        progress = FanoutProgress(key, total)
+        self.progress.pop(key, None)
+        self.progress[key] = progress
+        while len(self.progress) > self.history:
+            self.progress.pop(next(iter(self.progress)))
+        return progress
+
+    async def send_one(self, user, content, **kwargs):
+        """Send a single DM, returning 'sent', 'forbidden' or 'failed'."""
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                await user.send(content, **kwargs)
+                return "sent"
+            except discord.Forbidden:
+                return "forbidden"
+            except discord.RateLimited as e:
+                delay = e.retry_after
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    log.warning(f"[DM Fanout] Giving up on {user}: {e}")
+                    return "failed"
+                delay = self.base_backoff * 2 ** attempt
+                if e.status == 429:
+                    headers = getattr(e.response, "headers", None) or {}
+                    if headers.get("Retry-After"):
+                        delay = float(headers["Retry-After"])
+                    if headers.get("X-RateLimit-Global"):
+                        # A global limit applies to every route, so hold back the whole fan-out.
+                        self.bucket.pause(delay)
+            except (OSError, asyncio.TimeoutError) as e:
+                delay = self.base_backoff * 2 ** attempt
+                log.warning(f"[DM Fanout] Transient error sending to {user}: {e}")
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay + random.uniform(0, self.base_backoff))
+        return "failed"
@@ -0,0 +1,81 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+log = logging.getLogger(__name__)
+
+
+class InviteStats:
+    """Invite board numbers maintained incrementally instead of rescanning members and invites.
+
+    Seeded once from the member cache and the invites table, then kept
+    current by member join/remove events and invite writes, so building
+    the board is O(1) apart from expiring old joins out of the window.
+    """
+
+    def __init__(self, window=timedelta(hours=24)):
+        self.window = window
+        self.member_count = 0
+        self.recent_joins = OrderedDict()  # member_id -> joined_at, oldest join first
+        self.active_invites = 0
+        self.last_inviter = '----'
+        self.loaded = False
+        self.listeners = []  # Callables notified after every change (e.g. to push a board update)
+
+    async def load(self, bot, invites):
+        """Seed the counters with one pass over the member cache and two cheap queries."""
+        cutoff = datetime.now(timezone.utc) - self.window
+        self.member_count = 0
+        recent = []
+        for member in bot.get_all_members():
+            self.member_count += 1
+            if member.joined_at and member.joined_at >= cutoff:
+                recent.append((member.joined_at, member.id))
+        self.recent_joins = OrderedDict((member_id, joined_at) for joined_at, member_id in sorted(recent))
+
+        self.active_invites = await invites.count()
+        self.last_inviter = await invites.last_inviter() or '----'
+        self.loaded = True
+        log.info(f"InviteStats loaded: {self.member_count} members, {self.active_invites} invites, {len(self.recent_joins)} recent joins.")
+
+    def _changed(self):
+        for listener in self.listeners:
+            listener()
+
+    def member_joined(self, member):
+        self.member_count += 1
+        self.recent_joins.pop(member.id, None)
+        self.recent_joins[member.id] = member.joined_at or datetime.now(timezone.utc)
+        self._changed()
+
+    def member_left(self, member):
+        self.member_count = max(0, self.member_count - 1)
+        self.recent_joins.pop(member.id, None)
+        self._changed()
+
+    def invite_created(self, inviter, new_row):
+        """Record an invite write; new_row is False when an existing user's row was updated."""
+        if new_row:
+            self.active_invites += 1
+        self.last_inviter = inviter
+        self._changed()
+
+    def recent_join_count(self):
+        """Number of current members who joined inside the sliding window."""
+        cutoff = datetime.now(timezone.utc) - self.window
+        while self.recent_joins:
+            member_id, joined_at = next(iter(self.recent_joins.items()))
+            if joined_at >= cutoff:
+                break
+            self.recent_joins.popitem(last=False)
+        return len(self.recent_joins)
+
+    def snapshot(self):
+        recent_joins = self.recent_join_count()
+        return {
+            "member_count": self.member_count,
+            "active_invites": self.active_invites,
+            "recent_joins": recent_joins,
+            "last_inviter": self.last_inviter,
+            "conversion_rate": round((recent_joins / self.active_invites) * 100, 2) if self.active_invites else 0,
+        }
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+log = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    """Database-backed leader election between redundant bot instances.
+
+    Every instance tries to take or renew the lease every `renew_interval`
+    seconds, and the holder leads until it stops renewing for `ttl` seconds.
+    Listeners are called with True or False when this instance gains or
+    loses leadership. A leader that cannot reach the database steps down
+    before its lease can expire, so two instances never lead at once as long
+    as their clocks agree to within `renew_interval`.
+    """
+
+    def __init__(self, leases, name="background", ttl=15, renew_interval=5):
+        self.leases = leases
+        self.name = name
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.deadline = 0.0  # time.monotonic() after which an unrenewed lease may already belong to someone else
+        self.listeners = []  # Callables notified with the new state after every leadership change
+        self.task = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run(), name=f"leader-lease-{self.name}")
+
+    async def stop(self):
+        """Stop renewing and release the lease if we hold it, so a standby takes over immediately."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.is_leader:
+            try:
+                await self.leases.release(self.name, self.holder)
+            except Exception as e:
+                log.warning(f"[Leader] Could not release lease '{self.name}': {e}")
+            self._set(False)
+
+    async def run(self):
+        while True:
+            await self.renew()
+            await asyncio.sleep(self.renew_interval)
+
+    async def renew(self):
+        """Take or renew the lease once and update leadership accordingly."""
+        started = time.monotonic()
+        try:
+            held = await self.leases.acquire(
+                self.name, self.holder, datetime.now(timezone.utc), timedelta(seconds=self.ttl)
+            )
+        except Exception as e:
+            log.warning(f"[Leader] Could not renew lease '{self.name}': {e}")
+            # Ride out a short outage, but step down well before the lease could expire
+            held = self.is_leader and time.monotonic() < self.deadline - self.renew_interval
+        else:
+            if held:
+                self.deadline = started + self.ttl
+        self._set(held)
+        return held
+
+    def _set(self, leader):
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        log.info(f"[Leader] {self.holder} is now {'the leader' if leader else 'a follower'} for '{self.name}'.")
+        for listener in self.listeners:
+            try:
+                listener(leader)
+            except Exception:
+                log.exception("[Leader] Leadership listener failed.")
+
+
+def leads(bot):
+    """Whether this instance performs user-visible side effects: it holds the lease, or runs without one.
+
+    Redundant instances all receive the same gateway events and commands, so
+    only the leader answers them; otherwise every DM, invite and flyer would
+    be sent once per instance.
+    """
+    leader = getattr(bot, "leader", None)
+    return leader is None or leader.is_leader
@@ -0,0 +1,195 @@
+import asyncio
+import functools
+import logging
+import re
+import time
+from contextlib import contextmanager
+
+import discord
+
+log = logging.getLogger(__name__)
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LATENESS_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labelnames, values):
+    if not labelnames:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}  # label values tuple -> count
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values tuple -> [bucket counts..., sum, count]
+
+    def observe(self, value, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, series in self.series.items():
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (bound,))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, *args, **kwargs):
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "galaxian_db_query_seconds", "Latency of database statements issued by the cogs.", ("operation", "table")
+)
+DB_QUERY_ERRORS = REGISTRY.counter(
+    "galaxian_db_query_errors_total", "Database statements that raised an error.", ("operation", "table")
+)
+DISCORD_API_SECONDS = REGISTRY.histogram(
+    "galaxian_discord_api_seconds", "Latency of Discord REST calls, including rate-limit waits.", ("method", "route", "status")
+)
+REMINDER_LATENESS_SECONDS = REGISTRY.histogram(
+    "galaxian_reminder_lateness_seconds", "Delay between an event's reminder_time and the reminder firing.",
+    buckets=LATENESS_BUCKETS,
+)
+TASK_LOOP_SECONDS = REGISTRY.histogram(
+    "galaxian_task_loop_seconds", "Duration of one iteration of a background tasks.loop.", ("loop",)
+)
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "galaxian_event_loop_lag_seconds", "How late the event loop woke a fixed-interval heartbeat.", buckets=LAG_BUCKETS
+)
+LOOP_STALLS = REGISTRY.counter(
+    "galaxian_event_loop_stalls_total", "Event loop stalls longer than the watchdog threshold, by running coroutine.", ("coroutine",)
+)
+
+_SQL_VERB = re.compile(r"^\s*(\w+)")
+_SQL_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN|TABLE)\s+`?(\w+)", re.IGNORECASE)
+
+
+def query_labels(query):
+    """Low-cardinality (operation, table) labels for a SQL statement."""
+    verb = _SQL_VERB.match(query)
+    table = _SQL_TABLE.search(query)
+    return (verb.group(1).upper() if verb else "UNKNOWN", table.group(1) if table else "-")
+
+
+def instrument_loop(name):
+    """Decorator for tasks.loop coroutines that records each iteration's duration."""
+    def decorator(coro):
+        @functools.wraps(coro)
+        async def wrapper(*args, **kwargs):
+            with TASK_LOOP_SECONDS.time(name):
+                return await coro(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_discord_http(http):
+    """Time every REST request discord.py makes (send, fetch_message, edit, delete, create_invite, ...)."""
+    original = http.request
+
+    async def request(route, **kwargs):
+        status = "ok"
+        start = time.perf_counter()
+        try:
+            return await original(route, **kwargs)
+        except discord.HTTPException as e:
+            status = str(e.status)
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            DISCORD_API_SECONDS.observe(time.perf_counter() - start, route.method, route.path, status)
+
+    http.request = request
+
+
+async def start_metrics_server(host="127.0.0.1", port=9108):
+    """Serve REGISTRY in Prometheus text format on http://host:port/metrics."""
+    async def handle(reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass  # Discard request headers
+            parts = request_line.decode(errors="replace").split()
+            if len(parts) >= 2 and parts[1].split("?")[0] == "/metrics":
+                body = REGISTRY.render().encode()
+                head = "HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            else:
+                body = b"Not Found\n"
+                head = "HTTP/1.1 404 Not Found\r\nContent-Type: text/plain\r\n"
+            writer.write(f"{head}Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    log.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+    return server
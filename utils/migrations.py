@@ -0,0 +1,254 @@
+"""Versioned schema migrations, applied in order at startup.
+
+Each migration is (version, description, steps). A step is either a SQL
+string or an async callable taking the Database. Applied versions are
+recorded in schema_migrations, so every migration runs exactly once per
+database. Append new migrations to the end; never edit an applied one.
+The SQLite backend (storage/sqlite.py) keeps an equivalent list with the
+same version numbers; add a migration to both.
+"""
+import logging
+from datetime import datetime, timezone
+
+from storage.base import EventRepository, InviteRepository, OutboxRepository, RSVPRepository
+
+log = logging.getLogger(__name__)
+
+async def index_exists(db, table, index_name):
+    row = await db.fetchone('''
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    ''', (table, index_name))
+    return bool(row and row[0])
+
+
+async def column_exists(db, table, column):
+    row = await db.fetchone('''
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    ''', (table, column))
+    return bool(row and row[0])
+
+
+def add_column(table, column, definition):
+    """Step that adds a column unless it already exists, so a partially applied migration can be re-run."""
+    async def step(db):
+        if not await column_exists(db, table, column):
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return step
+
+
+def add_index(table, index_name, columns, unique=False):
+    """Step that creates an index unless it already exists (MySQL has no CREATE INDEX IF NOT EXISTS)."""
+    async def step(db):
+        if not await index_exists(db, table, index_name):
+            kind = "UNIQUE INDEX" if unique else "INDEX"
+            await db.execute(f"CREATE {kind} {index_name} ON {table} ({columns})")
+    return step
+
+
+def drop_index(table, index_name):
+    """Step that drops an index if it exists."""
+    async def step(db):
+        if await index_exists(db, table, index_name):
+            await db.execute(f"DROP INDEX {index_name} ON {table}")
+    return step
+
+
+async def mark_ended_cleaned_up(db):
+    """Treat events that ended before cleanup tracking existed as handled, so their flyers aren't all retried."""
+    marked = await db.execute(
+        "UPDATE events SET cleaned_up = TRUE WHERE end_time <= %s", (datetime.now(timezone.utc),)
+    )
+    log.info(f"[Migrations] Marked {marked} past event(s) as cleaned up.")
+
+
+async def dedupe_rsvps(db):
+    """Keep the earliest RSVP of any duplicates so the unique key can be created."""
+    if await index_exists(db, "rsvp_users", "uq_rsvp_event_user"):
+        return
+    removed = await db.execute('''
+        DELETE r1 FROM rsvp_users r1
+        JOIN rsvp_users r2 ON r1.event_id = r2.event_id AND r1.user_id = r2.user_id AND r1.id > r2.id
+    ''')
+    log.info(f"[Migrations] Removed {removed} duplicate RSVP rows.")
+
+
+MIGRATIONS = [
+    (1, "Initial schema", [
+        '''
+        CREATE TABLE IF NOT EXISTS embeds (
+            id VARCHAR(255) PRIMARY KEY,
+            message_id BIGINT,
+            channel_id BIGINT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS invites (
+            user_id VARCHAR(255) PRIMARY KEY,
+            last_invite DATETIME,
+            invite_url TEXT,
+            inviter VARCHAR(255),
+            invitee TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS events (
+            event_id INT PRIMARY KEY AUTO_INCREMENT,
+            name VARCHAR(255) NOT NULL,
+            crew_name VARCHAR(255) NOT NULL,
+            flyer_url TEXT,
+            crew_logo_url TEXT,
+            location VARCHAR(255),
+            event_date DATE,
+            start_time DATETIME,
+            end_time DATETIME,
+            age_requirement VARCHAR(10),
+            cover_fee VARCHAR(255),
+            reminder_time DATETIME,
+            contact_info TEXT,
+            event_type VARCHAR(255),
+            message_id BIGINT,
+            channel_id BIGINT,
+            reminder_sent BOOLEAN DEFAULT FALSE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS rsvp_users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            event_id INT NOT NULL,
+            user_id BIGINT NOT NULL,
+            rsvp_time DATETIME NOT NULL,
+            FOREIGN KEY (event_id) REFERENCES events(event_id) ON DELETE CASCADE
+        )
+        ''',
+    ]),
+    (2, "One RSVP per user and event", [
+        dedupe_rsvps,
+        add_index("rsvp_users", "uq_rsvp_event_user", "event_id, user_id", unique=True),
+    ]),
+    (3, "Indexes for hot-path queries", [
+        add_index("events", "idx_events_message_id", "message_id"),
+        add_index("events", "idx_events_reminder_date", "reminder_sent, event_date"),
+        add_index("events", "idx_events_end_time", "end_time"),
+        add_index("invites", "idx_invites_last_invite", "last_invite"),
+    ]),
+    (4, "Track which ended events have had their flyer cleaned up", [
+        add_column("events", "cleaned_up", "BOOLEAN NOT NULL DEFAULT FALSE"),
+        mark_ended_cleaned_up,
+        add_index("events", "idx_events_cleanup", "cleaned_up, end_time"),
+    ]),
+    (5, "Record each event's guild so background work can be partitioned by shard", [
+        add_column("events", "guild_id", "BIGINT NULL"),
+    ]),
+    (6, "Leader lease for background tasks shared by redundant instances", [
+        '''
+        CREATE TABLE IF NOT EXISTS leases (
+            name VARCHAR(64) PRIMARY KEY,
+            holder VARCHAR(128) NOT NULL,
+            expires_at DATETIME(6) NOT NULL
+        )
+        ''',
+    ]),
+    (7, "Durable outbox for reminder DMs", [
+        '''
+        CREATE TABLE IF NOT EXISTS outbox (
+            id BIGINT PRIMARY KEY AUTO_INCREMENT,
+            event_id INT NOT NULL,
+            user_id BIGINT NOT NULL,
+            kind VARCHAR(32) NOT NULL,
+            content TEXT NOT NULL,
+            status VARCHAR(16) NOT NULL DEFAULT 'pending',
+            attempts INT NOT NULL DEFAULT 0,
+            available_at DATETIME(6) NOT NULL,
+            claimed_by VARCHAR(160) NULL,
+            claimed_until DATETIME(6) NULL,
+            created_at DATETIME(6) NOT NULL,
+            completed_at DATETIME(6) NULL,
+            UNIQUE KEY uq_outbox_delivery (event_id, user_id, kind),
+            KEY idx_outbox_due (status, available_at),
+            KEY idx_outbox_claimed_by (claimed_by)
+        )
+        ''',
+    ]),
+    (8, "Index the pending-event scans; drop the unused flyer message index", [
+        add_index("events", "idx_events_pending", "reminder_sent, event_id"),
+        drop_index("events", "idx_events_message_id"),
+    ]),
+    (9, "Record the guild of each outbox delivery so workers only claim their own shards", [
+        add_column("outbox", "guild_id", "BIGINT NULL"),
+    ]),
+]
+
+# Queries issued by the cogs on hot paths (the repositories' own statements), with the
+# indexes EXPLAIN may pick for each. "PRIMARY" is MySQL's name for a primary key;
+# SQLite reports a TEXT primary key as sqlite_autoindex_<table>_1.
+HOT_QUERIES = [
+    ("Pending reminders at startup", EventRepository.PENDING_SQL, (0,), ("idx_events_pending", "PRIMARY")),
+    ("New events past the high-water mark", EventRepository.PENDING_SQL, (2 ** 31 - 1,),
+     ("idx_events_pending", "PRIMARY")),
+    ("Startup reaction resync", EventRepository.UPCOMING_SQL, ("2000-01-01",), ("idx_events_reminder_date",)),
+    ("Expired event cleanup", EventRepository.EXPIRED_SQL, ("2000-01-01 00:00:00",), ("idx_events_cleanup",)),
+    ("RSVP list for a reminder", RSVPRepository.USER_IDS_SQL, (0,), ("uq_rsvp_event_user",)),
+    ("Stored RSVPs for several events", RSVPRepository.FOR_EVENTS_SQL.format("%s, %s"), (0, 1),
+     ("uq_rsvp_event_user",)),
+    ("Invite cooldown check", InviteRepository.LAST_INVITE_SQL, ("0",), ("PRIMARY", "sqlite_autoindex_invites_1")),
+    ("Last invite created", InviteRepository.LAST_INVITER_SQL, (), ("idx_invites_last_invite",)),
+    ("Due outbox deliveries", OutboxRepository.DUE_SQL.format(shards=""),
+     ("2000-01-01 00:00:00", "2000-01-01 00:00:00", 100), ("idx_outbox_due",)),
+]
+
+
+async def run_migrations(db, migrations=MIGRATIONS):
+    """Apply every migration newer than the database's recorded schema version."""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    row = await db.fetchone("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+    current = row[0] if row else 0
+
+    for version, description, steps in migrations:
+        if version <= current:
+            continue
+        log.info(f"[Migrations] Applying {version}: {description}")
+        for step in steps:
+            if callable(step):
+                await step(db)
+            else:
+                await db.execute(step)
+        await db.execute(
+            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)", (version, description)
+        )
+        current = version
+
+    log.info(f"[Migrations] Schema is at version {current}.")
+    return current
+
+
+async def check_query_plans(db):
+    """EXPLAIN the cogs' hot queries and warn about any that do not use the expected index."""
+    problems = 0
+    for name, query, args, expected in HOT_QUERIES:
+        try:
+            plan = await db.fetchall(f"EXPLAIN {query}", args, dictionary=True)
+        except Exception as e:
+            log.warning(f"[Query Plans] Could not EXPLAIN '{name}': {e}")
+            continue
+        used = {row.get("key") for row in plan}
+        possible = set()
+        for row in plan:
+            possible.update((row.get("possible_keys") or "").split(","))
+        if used & set(expected):
+            continue
+        # Tiny tables often get a full scan even when the index is available; that is not a regression.
+        if possible & set(expected):
+            log.info(f"[Query Plans] '{name}' can use {' or '.join(expected)} but the optimizer chose {used or 'a full scan'} (small table?).")
+        else:
+            problems += 1
+            log.warning(f"[Query Plans] '{name}' cannot use {' or '.join(expected)}; plan: {plan}")
+    log.info(f"[Query Plans] Checked {len(HOT_QUERIES)} hot queries, {problems} missing an index.")
+    return problems
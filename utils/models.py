@@ -0,0 +1,114 @@
+from datetime import date, datetime, timedelta
+
+import pytz
+
+PST = pytz.timezone('America/Los_Angeles')
+UTC = pytz.utc
+
+
+def to_utc(value):
+    """Normalize a stored or user-supplied timestamp to an aware UTC datetime (naive values are UTC)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time(), UTC)
+    if isinstance(value, timedelta):  # MySQL TIME columns come back as timedelta
+        return datetime.min.replace(tzinfo=UTC) + value
+    if value is None:
+        raise ValueError("Encountered None when expecting a datetime string or object.")
+    raise TypeError(f"Unsupported type for datetime conversion: {type(value)}")
+
+
+def to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class Event:
+    """An event as held in memory by the scheduler, the reaction handler and the embed builder.
+
+    Built once per row (or per !newevent), with every timestamp normalized
+    to aware UTC and the PST strings used in embeds and DMs formatted up
+    front, so hot paths never convert or reformat them.
+    """
+
+    __slots__ = (
+        "event_id", "message_id", "channel_id", "guild_id", "name", "crew_name", "flyer", "crew_logo", "location", "date",
+        "start_time", "end_time", "reminder_time", "age_requirement", "cover_fee", "info", "type",
+        "start_date_pst", "start_time_pst", "end_time_pst",
+    )
+
+    def __init__(self, name, crew_name, flyer, crew_logo, location, date, start_time, end_time, reminder_time,
+                 age_requirement, cover_fee, info, type, event_id=None, message_id=None, channel_id=None, guild_id=None):
+        self.event_id = event_id
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.name = name
+        self.crew_name = crew_name
+        self.flyer = flyer
+        self.crew_logo = crew_logo
+        self.location = location
+        self.date = to_date(date)
+        self.start_time = to_utc(start_time)
+        self.end_time = to_utc(end_time)
+        self.reminder_time = to_utc(reminder_time)
+        self.age_requirement = age_requirement
+        self.cover_fee = cover_fee
+        self.info = info
+        self.type = type
+
+        start_pst = self.start_time.astimezone(PST)
+        self.start_date_pst = start_pst.strftime('%m-%d-%Y')
+        self.start_time_pst = start_pst.strftime('%I:%M %p')
+        self.end_time_pst = self.end_time.astimezone(PST).strftime('%I:%M %p')
+
+    @classmethod
+    def from_row(cls, row):
+        """Build an Event from an events row fetched as a dictionary."""
+        return cls(
+            event_id=row["event_id"],
+            message_id=row["message_id"],
+            channel_id=row["channel_id"],
+            guild_id=row["guild_id"],
+            name=row["name"],
+            crew_name=row["crew_name"],
+            flyer=row["flyer_url"],
+            crew_logo=row["crew_logo_url"],
+            location=row["location"],
+            date=row["event_date"],
+            start_time=row["start_time"],
+            end_time=row["end_time"],
+            reminder_time=row["reminder_time"],
+            age_requirement=row["age_requirement"],
+            cover_fee=row["cover_fee"],
+            info=row["contact_info"],
+            type=row["event_type"],
+        )
+
+    def columns(self):
+        """Column values for EventRepository.create."""
+        return dict(
+            name=self.name, crew_name=self.crew_name, flyer_url=self.flyer, crew_logo_url=self.crew_logo,
+            location=self.location, event_date=self.date, start_time=self.start_time, end_time=self.end_time,
+            age_requirement=self.age_requirement, cover_fee=self.cover_fee, contact_info=self.info,
+            event_type=self.type, reminder_time=self.reminder_time, message_id=self.message_id,
+            channel_id=self.channel_id, guild_id=self.guild_id,
+        )
+
+    def details(self):
+        """The event details block included in reminder DMs."""
+        return (
+            f"**Location**: {self.location}\n"
+            f"**Date**: {self.start_date_pst}\n"
+            f"**Start Time**: {self.start_time_pst} PST\n"
+            f"**Contact Info**: {self.info}"
+        )
+
+    def __repr__(self):
+        return f"<Event {self.event_id} {self.name!r} message={self.message_id}>"
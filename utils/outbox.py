@@ -0,0 +1,176 @@
+import asyncio
+import itertools
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+log = logging.getLogger(__name__)
+
+
+class OutboxWorker:
+    """Delivers DMs queued in the outbox table.
+
+    Due rows are claimed in batches and sent through DMFanout, which bounds
+    concurrency, paces sends under the global limit and retries briefly. The
+    next batch is claimed once half of the current one is done, so one slow
+    retry never holds up the rest. Each row is marked done as soon as its DM
+    is delivered. Rows that still fail are tried again later with exponential
+    backoff, up to `max_attempts`. A crashed worker's claims expire after
+    `claim_ttl`, so every queued DM is delivered at least once. A DM is sent
+    twice only if the worker dies between sending it and marking its row.
+    While rows wait for a send slot, the worker keeps extending their claim.
+
+    `shards` returns the (shard_count, shard_ids) this process runs, so with
+    the bot split across processes each worker only claims DMs for events in
+    its own guilds. Users missing from the cache are fetched with
+    `fetch_user` before a delivery is given up as missing.
+    """
+
+    def __init__(self, outbox, fanout, get_user, fetch_user=None, shards=None, batch_size=100, poll_interval=5,
+                 claim_ttl=120, max_attempts=5, base_backoff=30):
+        self.outbox = outbox  # storage OutboxRepository
+        self.fanout = fanout
+        self.get_user = get_user
+        self.fetch_user = fetch_user
+        self.shards = shards
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.claim_ttl = claim_ttl
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.claimer = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.claims = itertools.count()
+        self.claimed = set()  # Ids of rows this worker holds and has not finished
+        self.deliveries = set()  # In-flight delivery tasks
+        self.semaphore = asyncio.Semaphore(fanout.concurrency)
+        self.wakeup = asyncio.Event()
+        self.extended_at = time.monotonic()  # Last time the claims on held rows were pushed back
+        self.task = None
+        self.stopping = False  # The current task was cancelled and is handing its rows back
+
+    def start(self):
+        """Start the worker, replacing one that is still shutting down after stop()."""
+        if self.task is not None and not self.task.done() and not self.stopping:
+            return
+        self.stopping = False
+        self.task = asyncio.create_task(self._run(self.task), name="outbox-worker")
+
+    def stop(self):
+        """Stop claiming; unfinished rows are handed back as the worker task exits."""
+        if self.task is not None and not self.task.done():
+            self.stopping = True
+            self.task.cancel()
+
+    async def close(self):
+        self.stop()
+        if self.task is not None:
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def wake(self):
+        """Deliver newly queued rows now instead of at the next poll."""
+        self.wakeup.set()
+
+    async def _run(self, previous=None):
+        if previous is not None:
+            # Let a stopped worker finish releasing its claims before claiming again
+            await asyncio.wait([previous])
+        try:
+            while True:
+                self.wakeup.clear()
+                if self.claimed and time.monotonic() - self.extended_at >= self.claim_ttl / 3:
+                    await self.extend_claims()
+                if len(self.claimed) <= self.batch_size // 2:
+                    try:
+                        await self.run_once()
+                    except Exception as e:
+                        log.exception(f"[Outbox] Could not claim deliveries: {e}")
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self.deliveries):
+                task.cancel()
+            await asyncio.gather(*self.deliveries, return_exceptions=True)
+            if self.claimed:
+                try:
+                    await self.outbox.release(self.claimed)
+                except Exception as e:
+                    log.warning(f"[Outbox] Could not release {len(self.claimed)} claimed deliveries: {e}")
+                self.claimed.clear()
+
+    async def run_once(self):
+        """Claim one batch of due deliveries and start sending it; returns the number of rows claimed."""
+        now = datetime.now(timezone.utc)
+        rows = await self.outbox.claim(
+            f"{self.claimer}:{next(self.claims)}", now, now + timedelta(seconds=self.claim_ttl), self.batch_size,
+            shards=self.shards() if self.shards else None,
+        )
+        for row in rows:
+            if row["id"] in self.claimed:
+                continue  # Still waiting to be sent here; its claim lapsed while extending failed
+            self.claimed.add(row["id"])
+            task = asyncio.create_task(self.deliver(row))
+            self.deliveries.add(task)
+            task.add_done_callback(self.deliveries.discard)
+        return len(rows)
+
+    async def extend_claims(self):
+        """Push back the expiry of every held row so no worker claims it again while it waits to be sent."""
+        self.extended_at = time.monotonic()
+        try:
+            await self.outbox.extend(
+                self.claimed, datetime.now(timezone.utc) + timedelta(seconds=self.claim_ttl)
+            )
+        except Exception as e:
+            log.warning(f"[Outbox] Could not extend {len(self.claimed)} claimed deliveries: {e}")
+
+    async def resolve_user(self, user_id):
+        """The user to DM, from the cache or else the API; None if the account does not exist."""
+        user = self.get_user(user_id)
+        if user is None and self.fetch_user is not None:
+            await self.fanout.bucket.acquire()  # Lookups count against the same global limit as the DMs
+            try:
+                user = await self.fetch_user(user_id)
+            except discord.NotFound:
+                return None
+        return user
+
+    async def deliver(self, row):
+        try:
+            progress = self.fanout.progress.get(row["event_id"]) or self.fanout.track(row["event_id"])
+            async with self.semaphore:
+                try:
+                    user = await self.resolve_user(row["user_id"])
+                except discord.HTTPException as e:
+                    log.warning(f"[Outbox] Could not look up user {row['user_id']}: {e}")
+                    outcome = "failed"
+                else:
+                    outcome = "missing" if user is None else await self.fanout.send_one(user, row["content"])
+
+            attempts = row["attempts"] + 1
+            if outcome == "failed" and attempts < self.max_attempts:
+                delay = self.base_backoff * 2 ** row["attempts"] + random.uniform(0, self.base_backoff)
+                await self.outbox.retry(row["id"], datetime.now(timezone.utc) + timedelta(seconds=delay))
+                log.info(f"[Outbox] Delivery {row['id']} failed (attempt {attempts}), retrying in {delay:.0f}s.")
+            else:
+                await self.outbox.complete(row["id"], outcome, datetime.now(timezone.utc))
+                progress.record(outcome)
+            self.claimed.discard(row["id"])
+        except Exception as e:
+            # Left claimed: the claim expires and the row is retried, possibly re-sending a DM that went out
+            log.error(f"[Outbox] Could not record delivery {row['id']}: {e}")
+            self.claimed.discard(row["id"])
+        finally:
+            if len(self.claimed) == self.batch_size // 2:
+                self.wakeup.set()  # Half the batch is done; claim the next one
@@ -0,0 +1,87 @@
+import threading
+from io import BytesIO
+
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+TITLE_TEXT = "DARKNET"
+COLOR = (0x00, 0xFF, 0xE4)  # #00FFE4 on black
+SHADES = 16  # Palette entries; 16 shades keep anti-aliased text smooth in a 4-bit PNG
+
+
+def _gradient_palette():
+    """Palette whose index i is i/(SHADES-1) of the way from black to COLOR."""
+    palette = []
+    for i in range(SHADES):
+        palette.extend(round(channel * i / (SHADES - 1)) for channel in COLOR)
+    return palette
+
+
+class QRRenderer:
+    """Invite QR renderer with cached fonts, cached title layers and compact PNG output.
+
+    The image only ever contains black, #00FFE4 and anti-aliased blends of
+    the two, so it is drawn as a single-channel coverage mask and written as
+    a 16-entry palette PNG instead of a full RGBA image.
+    """
+
+    def __init__(self, font_path=FONT_PATH, box_size=10, border=4):
+        self.font_path = font_path
+        self.box_size = box_size
+        self.border = border
+        self.palette = _gradient_palette()
+        self.quantize = [(value * (SHADES - 1) + 127) // 255 for value in range(256)]
+        self._local = threading.local()  # FreeType faces are not shared between worker threads
+        self._bases = {}  # canvas size -> black canvas with the title already drawn
+
+    def _fonts(self):
+        fonts = getattr(self._local, "fonts", None)
+        if fonts is None:
+            fonts = (ImageFont.truetype(self.font_path, 28), ImageFont.truetype(self.font_path, 22))
+            self._local.fonts = fonts
+        return fonts
+
+    def _base(self, size):
+        """Return the static layer for a canvas size: black background plus the centred title."""
+        base = self._bases.get(size)
+        if base is None:
+            font_title, _ = self._fonts()
+            base = Image.new("L", (size, size), 0)
+            draw = ImageDraw.Draw(base)
+            title_x = (size - draw.textlength(TITLE_TEXT, font=font_title)) // 2
+            draw.text((title_x, 10), TITLE_TEXT, font=font_title, fill=255)
+            self._bases[size] = base
+        return base
+
+    def render(self, data):
+        """Render `data` as a QR code with the title and invite code, returning a PNG in a BytesIO."""
+        invite_code = data.split("https://")[-1]
+
+        qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=1, border=0)
+        qr.add_data(data)
+        qr.make(fit=True)
+        matrix = qr.get_matrix()
+
+        # Scale the module grid once with nearest-neighbour and drop it inside the quiet zone of the cached base.
+        modules = Image.new("L", (len(matrix), len(matrix)))
+        modules.putdata([255 if cell else 0 for row in matrix for cell in row])
+        modules = modules.resize((len(matrix) * self.box_size,) * 2, Image.NEAREST)
+        size = modules.width + 2 * self.border * self.box_size
+        canvas = self._base(size).copy()
+        canvas.paste(modules, (self.border * self.box_size,) * 2)
+
+        # Invite code text
+        _, font_code = self._fonts()
+        draw = ImageDraw.Draw(canvas)
+        code_x = (size - draw.textlength(invite_code, font=font_code)) // 2
+        draw.text((code_x, size - 40), invite_code, font=font_code, fill=255)
+
+        # Map coverage 0-255 onto the 16-shade palette and encode as a 4-bit PNG. zlib's default level
+        # is kept on purpose: optimize=True saves ~10% more bytes but costs several times the render.
+        image = Image.frombytes("P", canvas.size, canvas.point(self.quantize).tobytes())
+        image.putpalette(self.palette)
+        buffer = BytesIO()
+        image.save(buffer, format="PNG", bits=4)
+        buffer.seek(0)
+        return buffer
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from datetime import datetime
+
+import pytz
+
+log = logging.getLogger(__name__)
+
+
+UTC = pytz.utc
+
+
+class RSVPWriteBehind:
+    """Coalesces RSVP reactions into periodic multi-row insert-or-ignore batches.
+
+    Reactions are acknowledged from memory and written at most
+    `max_latency` seconds later (sooner once `batch_size` rows are
+    waiting). The (event_id, user_id) unique key on rsvp_users makes
+    duplicates in a batch or across restarts harmless.
+    """
+
+    def __init__(self, rsvps, batch_size=500, max_latency=1.0):
+        self.rsvps = rsvps  # storage RSVPRepository
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.pending = {}  # (event_id, user_id) -> rsvp_time
+        self.has_items = asyncio.Event()
+        self.batch_full = asyncio.Event()
+        self.flush_lock = asyncio.Lock()
+        self.task = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    def add(self, event_id, user_id, rsvp_time=None):
+        self.pending.setdefault((event_id, user_id), rsvp_time or datetime.now(UTC))
+        self.has_items.set()
+        if len(self.pending) >= self.batch_size:
+            self.batch_full.set()
+
+    async def _run(self):
+        while True:
+            await self.has_items.wait()
+            try:
+                await asyncio.wait_for(self.batch_full.wait(), timeout=self.max_latency)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self):
+        """Write every pending RSVP in one statement. Failed batches are retried on the next flush."""
+        async with self.flush_lock:
+            self.has_items.clear()
+            self.batch_full.clear()
+            if not self.pending:
+                return 0
+            batch, self.pending = self.pending, {}
+            try:
+                await self.rsvps.add_many(
+                    [(event_id, user_id, rsvp_time) for (event_id, user_id), rsvp_time in batch.items()]
+                )
+                return len(batch)
+            except Exception as e:
+                log.error(f"[RSVP Queue] Failed to write {len(batch)} RSVPs, will retry: {e}")
+                for key, rsvp_time in batch.items():
+                    self.pending.setdefault(key, rsvp_time)
+                self.has_items.set()
+                return 0
+
+    async def close(self):
+        """Stop the background flusher and write anything still pending."""
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
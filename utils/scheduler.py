@@ -0,0 +1,96 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime
+
+import pytz
+
+UTC = pytz.utc
+
+
+class ReminderScheduler:
+    """Keyed priority queue of reminders that sleeps until the next one is due.
+
+    Entries are keyed by event_id, so scheduling the same event twice replaces
+    the earlier entry instead of duplicating it. Replaced and cancelled entries
+    are left in the heap and skipped lazily when they reach the top.
+    """
+
+    def __init__(self):
+        self._heap = []  # (reminder_time, sequence, event_id)
+        self._entries = {}  # event_id -> (reminder_time, sequence, payload)
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, event_id):
+        return event_id in self._entries
+
+    def schedule(self, event_id, reminder_time, payload):
+        """Add or reschedule the reminder for event_id. O(log n)."""
+        sequence = next(self._sequence)
+        self._entries[event_id] = (reminder_time, sequence, payload)
+        heapq.heappush(self._heap, (reminder_time, sequence, event_id))
+        if self._heap[0][1] == sequence:
+            # The new entry is now the earliest one; wake the waiter so it re-arms its timer.
+            self._wakeup.set()
+
+    def cancel(self, event_id):
+        """Drop the pending reminder for event_id, if any."""
+        return self._entries.pop(event_id, None) is not None
+
+    def clear(self):
+        self._heap.clear()
+        self._entries.clear()
+        self._wakeup.set()
+
+    def _discard_stale(self):
+        while self._heap:
+            reminder_time, sequence, event_id = self._heap[0]
+            entry = self._entries.get(event_id)
+            if entry is not None and entry[1] == sequence:
+                return
+            heapq.heappop(self._heap)
+
+    def peek(self):
+        """Return (reminder_time, payload) for the next reminder, or None."""
+        self._discard_stale()
+        if not self._heap:
+            return None
+        event_id = self._heap[0][2]
+        reminder_time, _, payload = self._entries[event_id]
+        return reminder_time, payload
+
+    def pop_due(self, now=None):
+        """Remove and return the payloads of every reminder due at or before now."""
+        now = now or datetime.now(UTC)
+        due = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            _, _, event_id = heapq.heappop(self._heap)
+            due.append(self._entries.pop(event_id)[2])
+
+    async def wait_for_due(self):
+        """Sleep until at least one reminder is due, then pop and return the due payloads."""
+        while True:
+            self._wakeup.clear()
+            head = self.peek()
+            if head is None:
+                await self._wakeup.wait()
+                continue
+
+            delay = (head[0] - datetime.now(UTC)).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    continue  # An earlier reminder was scheduled; re-check the head.
+                except asyncio.TimeoutError:
+                    pass
+
+            due = self.pop_due()
+            if due:
+                return due
@@ -0,0 +1,38 @@
+"""Shard ownership, used to split background work between bot processes.
+
+Discord routes a guild's gateway events to shard (guild_id >> 22) % shard_count.
+Each process runs the background work (reminders, flyer cleanup, reaction
+resync) only for events whose guild is on one of its own shards. That work
+splits across processes the same way the gateway traffic does, and no
+event is handled twice.
+"""
+import logging
+
+log = logging.getLogger(__name__)
+
+
+def shard_for(guild_id, shard_count):
+    """The shard Discord routes guild_id to."""
+    return (guild_id >> 22) % shard_count
+
+
+def local_shards(bot):
+    """(shard_count, shard ids run by this process); an unsharded bot is shard 0 of 1."""
+    shard_count = getattr(bot, "shard_count", None) or 1
+    shard_ids = getattr(bot, "shard_ids", None)
+    if shard_ids is None:
+        shard_id = getattr(bot, "shard_id", None)
+        shard_ids = range(shard_count) if shard_id is None else [shard_id]
+    return shard_count, frozenset(shard_ids)
+
+
+def owns_guild(bot, guild_id):
+    """Whether this process runs the shard that owns guild_id (an unknown guild belongs to shard 0)."""
+    shard_count, shard_ids = local_shards(bot)
+    return (0 if guild_id is None else shard_for(guild_id, shard_count)) in shard_ids
+
+
+def shard_share(bot):
+    """Fraction of all shards run by this process, for splitting limits shared by the whole bot token."""
+    shard_count, shard_ids = local_shards(bot)
+    return len(shard_ids) / shard_count
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from utils.metrics import LOOP_LAG_SECONDS, LOOP_STALLS
+
+log = logging.getLogger(__name__)
+
+
+THIS_FILE = os.path.abspath(__file__)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(THIS_FILE))
+
+
+class LoopWatchdog:
+    """Measures event-loop lag and captures what was running when the loop stalls.
+
+    A heartbeat coroutine wakes every `interval` seconds and records how late
+    it was. A separate thread watches that heartbeat; once it is more than
+    `threshold` seconds stale the thread snapshots the loop thread's stack and
+    the asyncio task that was running, so blocking calls (sync I/O, CPU-heavy
+    work in a listener or tasks.loop) can be traced to their source. When the
+    loop recovers the stall is logged with its total duration and passed to
+    `on_stall`, at most once per `report_cooldown` seconds.
+    """
+
+    def __init__(self, threshold=0.5, interval=0.1, on_stall=None, report_cooldown=300):
+        self.threshold = threshold
+        self.interval = interval
+        self.on_stall = on_stall
+        self.report_cooldown = report_cooldown
+        self.loop = None
+        self.loop_thread_id = None
+        self.last_beat = time.monotonic()
+        self.stall = None  # Snapshot taken by the watchdog thread during the current stall
+        self.last_report = float("-inf")
+        self.heartbeat_task = None
+        self.notify_tasks = set()  # Stall reports being delivered
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        """Start watching the running loop; call from inside it."""
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stopped.clear()
+        self.heartbeat_task = self.loop.create_task(self._heartbeat(), name="loop-watchdog-heartbeat")
+        self.thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.last_beat = now
+            LOOP_LAG_SECONDS.observe(max(0.0, now - expected))
+
+            stall, self.stall = self.stall, None
+            if stall:
+                stall["seconds"] = now - stall["started"]
+                self._report(stall)
+
+    def _watch(self):
+        while not self.stopped.wait(self.interval):
+            blocked_for = time.monotonic() - self.last_beat
+            if blocked_for > self.threshold and self.stall is None:
+                self.stall = self._snapshot(self.last_beat)
+                log.warning(
+                    f"[Watchdog] Event loop blocked for {blocked_for:.2f}s in {self.stall['task']} "
+                    f"at {self.stall['culprit']}",
+                    extra={"blocked_seconds": round(blocked_for, 3), "task": self.stall["task"],
+                           "culprit": self.stall["culprit"]},
+                )
+
+    def _snapshot(self, started):
+        """Capture the loop thread's stack and current task. Runs on the watchdog thread."""
+        frame = sys._current_frames().get(self.loop_thread_id)
+        stack = traceback.extract_stack(frame) if frame else []
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            task = None
+        if task:
+            coro = getattr(task.get_coro(), "__qualname__", "unknown")
+            name = f"{task.get_name()} ({coro})"
+        else:
+            coro = name = "callback"  # A plain loop callback (call_soon/transport), not a task
+        own_frames = [f for f in stack if f.filename.startswith(PROJECT_ROOT) and f.filename != THIS_FILE]
+        culprit = own_frames[-1] if own_frames else (stack[-1] if stack else None)
+        return {
+            "started": started,
+            "task": name,
+            "coro": coro,
+            "culprit": f"{os.path.relpath(culprit.filename, PROJECT_ROOT)}:{culprit.lineno} in {culprit.name}"
+            if culprit else "unknown",
+            "stack": "".join(traceback.format_list(stack[-15:])),
+        }
+
+    def _report(self, stall):
+        LOOP_STALLS.inc(stall["coro"])
+        log.warning(
+            f"[Watchdog] Event loop stalled for {stall['seconds']:.2f}s in {stall['task']} at {stall['culprit']}\n"
+            f"{stall['stack']}",
+            extra={"stall_seconds": round(stall["seconds"], 3), "task": stall["task"], "culprit": stall["culprit"]},
+        )
+        now = time.monotonic()
+        if self.on_stall and now - self.last_report >= self.report_cooldown:
+            self.last_report = now
+            task = asyncio.create_task(self._notify(stall))
+            self.notify_tasks.add(task)
+            task.add_done_callback(self.notify_tasks.discard)
+
+    async def _notify(self, stall):
+        try:
+            await self.on_stall(stall)
+        except Exception as e:
+            log.error(f"[Watchdog] Failed to deliver stall report: {e}")